@@ -1,301 +1,262 @@
 # experiments/experiment_driver.py
 import argparse
 import asyncio
-import csv
+import functools
+import hashlib
 import json
 import os
 import signal
-import time
 import random
 import httpx
-from datetime import datetime
+import numpy as np
+import orjson
+import pandas as pd
+import pyarrow.parquet as pq
+import uvloop
 
-from collections import defaultdict
 
-
-def compute_metrics_from_workload(csv_path, warmup, failure_duration, exclude_nodes=None):
+def _parse_payload(raw_value):
     """
-    Robust metrics computation that correctly handles:
-      - multi-version reads (list of {value, vc, ts})
-      - Read-Your-Write: pass if any returned sibling equals client's last write
-      - Monotonic Reads: uses max returned ts to check monotonicity
-      - Monotonic Writes: basic check using last write tracking
-      - Time-windowed availability
+    Parse the versions_or_vc cell of a workload row.
+    workload.py always writes valid JSON, so non-JSON cells are kept as raw strings.
     """
+    if not raw_value:
+        return None
+    try:
+        return orjson.loads(raw_value)
+    except orjson.JSONDecodeError:
+        return raw_value  # fallback
 
-    import csv, json, ast, time
-    from datetime import datetime
-    from collections import defaultdict
-
-    events = []
-    with open(csv_path) as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-
-            # -------------------------------
-            # 1. TIMESTAMP PARSING (FIXED)
-            # -------------------------------
-            ts_raw = row.get("timestamp") or row.get("ts")
-            if not ts_raw:
-                # skip rows without a usable timestamp
-                continue
-            ts = None
-            # try float first
-            try:
-                ts = float(ts_raw)
-            except Exception:
-                # try ISO 8601
+
+# JSON scalars, i.e. dict values that are hashable as-is
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def _summarize_payload(parsed):
+    """
+    Reduce a parsed payload to the fields the consistency checks need.
+    Returns (read_values, read_max_ts, is_multi_version, best_read_value).
+    """
+    read_values = None
+    read_max_ts = None
+    is_multi_version = False
+    best_read_value = None
+
+    if isinstance(parsed, list):
+        vals = []
+        max_ts = None
+        max_ts_value = None
+        for item in parsed:
+            if isinstance(item, dict):
+                v = item.get("value")
+                vals.append(v)
                 try:
-                    ts = datetime.fromisoformat(ts_raw).timestamp()
+                    t = float(item.get("ts", 0))
+                    if max_ts is None or t > max_ts:
+                        max_ts = t
+                        max_ts_value = v
                 except Exception:
-                    try:
-                        ts = datetime.fromisoformat(ts_raw.replace(" ", "T")).timestamp()
-                    except Exception:
-                        # give up on this row
-                        continue
-
-            client = row.get("client") or row.get("worker")
-            op = (row.get("op") or "").upper()
-            key = row.get("key")
-            success_field = str(row.get("success")).lower()
-            success = success_field == "true"
-            node = row.get("node")
-            raw_value = row.get("value")
-            if raw_value in (None, ""):
-                raw_value = row.get("versions_or_vc")
-
-            # -----------------------------------
-            # 2. JSON / LIST PARSING FIX
-            # -----------------------------------
-            parsed = None
-            if raw_value is None:
-                parsed = None
+                    pass
             else:
-                cleaned = raw_value.replace('""', '"')  # CSV escapes
-                try:
-                    parsed = json.loads(cleaned)
-                except Exception:
-                    try:
-                        parsed = ast.literal_eval(cleaned)
-                    except Exception:
-                        parsed = raw_value  # fallback
-
-            # -------------------------------
-            # NORMALIZE READ PAYLOADS
-            # -------------------------------
-            read_values = None
-            read_max_ts = None
-            is_multi_version = False
-            best_read_value = None
-            best_read_ts = None
-
-            if isinstance(parsed, list):
-                vals = []
-                max_ts = None
-                max_ts_value = None
-                for item in parsed:
-                    if isinstance(item, dict):
-                        v = item.get("value")
-                        vals.append(v)
-                        try:
-                            t = float(item.get("ts", 0))
-                            if max_ts is None or t > max_ts:
-                                max_ts = t
-                                max_ts_value = v
-                        except Exception:
-                            pass
-                    else:
-                        vals.append(item)
+                vals.append(item)
 
-                read_values = set(vals)
-                read_max_ts = max_ts
-                best_read_value = max_ts_value if max_ts_value is not None else (vals[-1] if vals else None)
-                best_read_ts = max_ts
-                is_multi_version = len(vals) > 1
+        read_values = set(vals)
+        read_max_ts = max_ts
+        best_read_value = max_ts_value if max_ts_value is not None else (vals[-1] if vals else None)
+        is_multi_version = len(vals) > 1
 
-            elif isinstance(parsed, dict) and "value" in parsed:
-                read_values = {parsed.get("value")}
-                try:
-                    read_max_ts = float(parsed.get("ts", 0))
-                except Exception:
-                    read_max_ts = None
-                best_read_value = parsed.get("value")
-                best_read_ts = read_max_ts
+    elif isinstance(parsed, dict) and "value" in parsed:
+        read_values = {parsed.get("value")}
+        try:
+            read_max_ts = float(parsed.get("ts", 0))
+        except Exception:
+            read_max_ts = None
+        best_read_value = parsed.get("value")
 
-            elif parsed is None or parsed == []:
-                read_values = set()
-                read_max_ts = None
-                best_read_value = None
-                best_read_ts = None
+    elif parsed is None or parsed == []:
+        read_values = set()
 
+    else:
+        # Hashable fallback: flat dicts become sorted item tuples, nested ones
+        # are serialized (orjson, sorted keys) for set membership
+        if isinstance(parsed, dict):
+            if all(isinstance(v, _SCALAR_TYPES) for v in parsed.values()):
+                read_values = {tuple(sorted(parsed.items()))}
             else:
-                # Hashable fallback: serialize dicts to JSON for set membership
-                if isinstance(parsed, dict):
-                    read_values = {json.dumps(parsed, sort_keys=True)}
-                else:
-                    read_values = {parsed}
-                read_max_ts = None
-                best_read_value = parsed
-                best_read_ts = None
-
-            events.append({
-                "ts": ts,
-                "client": client,
-                "op": op,
-                "key": key,
-                "success": success,
-                "node": node,
-                "raw_value": raw_value,
-                "parsed": parsed,
-                "read_values": read_values,
-                "read_max_ts": read_max_ts,
-                "is_multi_version": is_multi_version,
-                "best_read_value": best_read_value,
-                "best_read_ts": best_read_ts
-            })
-
-    if not events:
-        return {}
+                read_values = {orjson.dumps(parsed, option=orjson.OPT_SORT_KEYS)}
+        else:
+            read_values = {parsed}
+        best_read_value = parsed
 
-    # -------------------------------
-    # WINDOW BOUNDARIES
-    # -------------------------------
-    t0 = events[0]["ts"]
-    warmup_end = t0 + warmup
-    failure_end = warmup_end + failure_duration
+    return read_values, read_max_ts, is_multi_version, best_read_value
 
-    windows = {
-        "warmup":  {"start": t0, "end": warmup_end},
-        "failure": {"start": warmup_end, "end": failure_end},
-        "recovery": {"start": failure_end, "end": float("inf")}
-    }
 
-    total_ops = 0
-    ok_ops = 0
-    read_ops = write_ops = 0
-    read_ok = write_ok = 0
+def _written_value(parsed, raw_value):
+    """Value a successful WRITE row recorded (its stored_version's value)."""
+    if isinstance(parsed, (str, int, float)):
+        return parsed
+    if isinstance(parsed, dict) and "value" in parsed:
+        return parsed["value"]
+    return raw_value
 
-    window_ops = {w: 0 for w in windows}
-    window_ok = {w: 0 for w in windows}
-    window_reads = {w: 0 for w in windows}
-    window_read_ok = {w: 0 for w in windows}
-    window_writes = {w: 0 for w in windows}
-    window_write_ok = {w: 0 for w in windows}
 
-    exclude_nodes = set(exclude_nodes or [])
+def _gather(values, pos):
+    """
+    values[pos] for an array of float row positions where NaN means
+    "no such row"; missing entries come back as None.
+    """
+    out = np.full(len(pos), None, dtype=object)
+    hit = ~np.isnan(pos)
+    out[hit] = values[pos[hit].astype(np.intp)]
+    return out
 
-    last_write_value = defaultdict(lambda: None)
-    last_write_ts = defaultdict(lambda: None)
-    last_write_value_global = defaultdict(lambda: None)  # latest written value per key
-    last_write_ts_global = defaultdict(lambda: None)     # latest write ts per key (any client)
-    last_read_max_ts = defaultdict(lambda: None)
-
-    # Staleness tracking (value-based): does read return latest written value?
-    stale_reads = 0
-    stale_reads_checked = 0
-
-    empty_reads = 0
-    multi_version_reads = 0
-    ryw_violations = 0
-    monotonic_read_violations = 0
-    monotonic_write_violations = 0
-
-    # -------------------------------------
-    # MAIN LOOP
-    # -------------------------------------
-    for ev in events:
-        total_ops += 1
-        ts = ev["ts"]
-        client = ev["client"]
-        key = ev["key"]
-        op = ev["op"]
-        success = ev["success"]
-        node = ev.get("node")
-        read_values = ev["read_values"]
-        read_max_ts = ev["read_max_ts"]
-        is_multi = ev["is_multi_version"]
-
-        excluded_node = node in exclude_nodes
-
-        # classify window
-        w = None
-        for window_name, bounds in windows.items():
-            if bounds["start"] <= ts < bounds["end"]:
-                w = window_name
-                break
-        if w is None:
-            w = "recovery"
-
-        if not excluded_node:
-            window_ops[w] += 1
-
-            if op == "READ":
-                read_ops += 1
-                window_reads[w] += 1
-            else:
-                write_ops += 1
-                window_writes[w] += 1
 
-            if success:
-                ok_ops += 1
-                window_ok[w] += 1
+def _column(df, *names):
+    """Return the first of `names` present in df as a str Series (empty if none)."""
+    for name in names:
+        if name in df.columns:
+            return df[name]
+    return pd.Series([""] * len(df), index=df.index, dtype=object)
 
-                if op == "READ":
-                    read_ok += 1
-                    window_read_ok[w] += 1
-                else:
-                    write_ok += 1
-                    window_write_ok[w] += 1
-
-        # -------------------------------
-        # CONSISTENCY METRICS
-        # -------------------------------
-        if op == "READ" and success:
-
-            if not read_values:
-                empty_reads += 1
-
-            if is_multi:
-                multi_version_reads += 1
-
-            # RYW
-            prev_written = last_write_value[(client, key)]
-            if prev_written is not None:
-                if prev_written not in read_values:
-                    ryw_violations += 1
-
-            # Monotonic Reads
-            if read_max_ts is not None:
-                prev_max = last_read_max_ts[(client, key)]
-                if prev_max is not None and read_max_ts < prev_max:
-                    monotonic_read_violations += 1
-                last_read_max_ts[(client, key)] = read_max_ts
-
-            # Read staleness (value-based): compare chosen latest read value to latest written value
-            latest_written_val = last_write_value_global.get(key)
-            if latest_written_val is not None:
-                stale_reads_checked += 1
-                chosen_read_val = ev.get("best_read_value")
-                if chosen_read_val != latest_written_val:
-                    stale_reads += 1
-
-        elif op == "WRITE" and success:
-            raw_val = ev.get("parsed")
-            if isinstance(raw_val, (str, int, float)):
-                written = raw_val
-            elif isinstance(raw_val, dict) and "value" in raw_val:
-                written = raw_val["value"]
-            else:
-                written = ev.get("raw_value")
 
-            prev_written = last_write_value[(client, key)]
-            if prev_written is not None and written is not None and written != prev_written:
-                monotonic_write_violations += 1
+def _numeric_seconds(ts_raw):
+    return pd.to_numeric(ts_raw, errors="coerce")
+
+
+def _iso_seconds(ts_raw):
+    iso = pd.to_datetime(ts_raw.str.replace(" ", "T", regex=False),
+                         format="ISO8601", errors="coerce")
+    # naive timestamps are read as UTC; only offsets from t0 are used
+    return (iso - pd.Timestamp(0)).dt.total_seconds()
+
+
+def _parse_ts_column(ts_raw):
+    """
+    Vectorized timestamp parsing: float seconds or ISO 8601 strings.
+    A log uses one format throughout, so the first non-empty cell picks the
+    parser; only cells it rejects are retried with the other one.
+    Returns a float64 array with NaN for unparseable cells.
+    """
+    present = ts_raw != ""
+    if not present.any():
+        return np.full(len(ts_raw), np.nan)
+    first = ts_raw[present].iloc[0]
+    if np.isnan(_numeric_seconds(pd.Series([first])).iloc[0]):
+        primary, fallback = _iso_seconds, _numeric_seconds
+    else:
+        primary, fallback = _numeric_seconds, _iso_seconds
+
+    ts = pd.Series(np.nan, index=ts_raw.index)
+    ts[present] = primary(ts_raw[present])
+    missing = ts.isna() & present
+    if missing.any():
+        ts[missing] = fallback(ts_raw[missing])
+    return ts.to_numpy(dtype=np.float64)
+
+
+# rows per chunk when streaming a workload log
+_WORKLOAD_CHUNK_ROWS = 1 << 18
+
+
+def _reduce_workload_chunk(df):
+    """
+    Reduce one chunk of workload rows to the typed columns the metrics use.
+    Payloads are parsed (successful ops only; failed rows only feed the
+    availability counters) and immediately summarized, so neither the raw
+    JSON strings nor the parsed version lists outlive the chunk.
+    """
+    ts_col = _column(df, "timestamp", "ts")
+    if pd.api.types.is_float_dtype(ts_col):
+        # Parquet logs store ts as float seconds already
+        ts_arr = ts_col.to_numpy(dtype=np.float64)
+    else:
+        ts_arr = _parse_ts_column(ts_col)
+    valid = ~np.isnan(ts_arr)
+    # skip rows without a usable timestamp
+    df = df[valid]
+
+    op_arr = _column(df, "op").str.upper().to_numpy(dtype=object)
+    success_col = _column(df, "success")
+    if pd.api.types.is_bool_dtype(success_col):
+        success_arr = success_col.to_numpy(dtype=bool)
+    else:
+        # workload.py writes Python's "True"/"False"; only other spellings get lowercased
+        success_arr = (success_col == "True").to_numpy(copy=True)
+        other = ~success_arr & (success_col != "False").to_numpy()
+        if other.any():
+            success_arr[other] = (success_col[other].str.lower() == "true").to_numpy()
+    raw_values = _column(df, "value")
+    raw_values = raw_values.where(raw_values != "", _column(df, "versions_or_vc")).to_numpy(dtype=object)
+
+    n_rows = len(df)
+    cols = {
+        "ts": ts_arr[valid],
+        "client": _column(df, "client", "worker").to_numpy(dtype=object),
+        "op": op_arr,
+        "key": _column(df, "key").to_numpy(dtype=object),
+        "success": success_arr,
+        "node": _column(df, "node").to_numpy(dtype=object),
+        "written": np.full(n_rows, None, dtype=object),
+        "read_values": np.full(n_rows, None, dtype=object),
+        "read_max_ts": np.full(n_rows, None, dtype=object),
+        "is_multi": np.zeros(n_rows, dtype=bool),
+        "best_read_value": np.full(n_rows, None, dtype=object),
+    }
+    for i in np.flatnonzero(success_arr):
+        parsed = _parse_payload(raw_values[i])
+        if op_arr[i] == "WRITE":
+            cols["written"][i] = _written_value(parsed, raw_values[i])
+        (cols["read_values"][i], cols["read_max_ts"][i],
+         cols["is_multi"][i], cols["best_read_value"][i]) = _summarize_payload(parsed)
+    return cols
+
+
+def _iter_workload_chunks(path):
+    """Yield a workload log as DataFrame chunks; .parquet logs keep their column types."""
+    if path.endswith(".parquet"):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=_WORKLOAD_CHUNK_ROWS):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, dtype=str, keep_default_na=False,
+                               chunksize=_WORKLOAD_CHUNK_ROWS)
 
-            last_write_value[(client, key)] = written
-            last_write_ts[(client, key)] = ts
-            last_write_value_global[key] = written
-            last_write_ts_global[key] = ts
+
+def _load_workload(path):
+    """
+    Stream a workload log (CSV or Parquet) into typed columns, chunk by chunk, ordered by ts.
+    Returns a dict of equal-length numpy arrays, or None if no row has a usable ts.
+    """
+    parts = [_reduce_workload_chunk(chunk) for chunk in _iter_workload_chunks(path)]
+    parts = [part for part in parts if len(part["ts"])]
+    if not parts:
+        return None
+    cols = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    # workers append buffered batches, so file order is only time order per worker
+    order = np.argsort(cols["ts"], kind="stable")
+    return {name: col[order] for name, col in cols.items()}
+
+
+def _availability_metrics(window_idx, window_names, is_read, success_arr, included, total_ops):
+    """
+    Overall and per-window availability from bincounts over boolean masks.
+    Only the window index, op, success and node-exclusion columns are touched.
+    """
+    is_write = ~is_read
+    ok = success_arr & included
+
+    def _per_window(mask):
+        return np.bincount(window_idx[mask], minlength=len(window_names))
+
+    window_ops = _per_window(included)
+    window_ok = _per_window(ok)
+    window_reads = _per_window(is_read & included)
+    window_read_ok = _per_window(is_read & ok)
+    window_writes = _per_window(is_write & included)
+    window_write_ok = _per_window(is_write & ok)
+
+    ok_ops = int(window_ok.sum())
+    read_ops, read_ok = int(window_reads.sum()), int(window_read_ok.sum())
+    write_ops, write_ok = int(window_writes.sum()), int(window_write_ok.sum())
 
     availability = {
         "overall": ok_ops / total_ops if total_ops else 0.0,
@@ -304,16 +265,68 @@ def compute_metrics_from_workload(csv_path, warmup, failure_duration, exclude_no
     }
 
     windowed_availability = {}
-    for wname in windows:
-        win_total = window_ops[wname]
+    for wi, wname in enumerate(window_names):
+        win_total = int(window_ops[wi])
+        win_reads = int(window_reads[wi])
+        win_writes = int(window_writes[wi])
         windowed_availability[wname] = {
-            "overall": window_ok[wname] / win_total if win_total else 0.0,
-            "reads": window_read_ok[wname] / window_reads[wname] if window_reads[wname] else 0.0,
-            "writes": window_write_ok[wname] / window_writes[wname] if window_writes[wname] else 0.0,
+            "overall": int(window_ok[wi]) / win_total if win_total else 0.0,
+            "reads": int(window_read_ok[wi]) / win_reads if win_reads else 0.0,
+            "writes": int(window_write_ok[wi]) / win_writes if win_writes else 0.0,
             "ops": win_total
         }
+    return availability, windowed_availability
+
+
+def _consistency_metrics(client_key_codes, key_codes, is_read_ok, is_write_ok, written_arr,
+                         read_values_arr, read_max_ts_arr, is_multi_arr, best_read_value_arr):
+    """
+    RYW, staleness and monotonic read/write checks over the integer-encoded
+    (client, key) / key groups and the per-row payload summaries.
+    """
+    n_rows = len(key_codes)
+    read_rows = np.flatnonzero(is_read_ok)
+    read_values_ok = read_values_arr[read_rows]
+
+    # position of the latest successful write at or before each row,
+    # forward-filled per (client, key) for RYW and per key for staleness
+    write_pos = pd.Series(np.where(is_write_ok, np.arange(n_rows), np.nan))
+    client_last_write = write_pos.groupby(client_key_codes, sort=False).ffill().to_numpy()
+    key_last_write = write_pos.groupby(key_codes, sort=False).ffill().to_numpy()
+
+    # RYW: pass if any returned sibling equals the client's last write
+    prev_written = _gather(written_arr, client_last_write[read_rows])
+    has_prev = pd.notna(prev_written)
+    ryw_violations = sum(
+        prev not in values
+        for prev, values in zip(prev_written[has_prev], read_values_ok[has_prev])
+    )
+
+    # Read staleness (value-based): compare chosen latest read value to latest written value
+    latest_written = _gather(written_arr, key_last_write[read_rows])
+    has_latest = pd.notna(latest_written)
+    stale_reads_checked = int(has_latest.sum())
+    stale_reads = int((best_read_value_arr[read_rows][has_latest] != latest_written[has_latest]).sum())
+
+    empty_reads = sum(not values for values in read_values_ok)
+    multi_version_reads = int(is_multi_arr[read_rows].sum())
+
+    # Monotonic Reads: a read's max ts must not drop below the previous
+    # read's max ts for the same (client, key)
+    mr_rows = read_rows[pd.notna(read_max_ts_arr[read_rows])]
+    mr_diffs = (pd.Series(read_max_ts_arr[mr_rows].astype(np.float64))
+                .groupby(client_key_codes[mr_rows], sort=False).diff())
+    monotonic_read_violations = int((mr_diffs < 0).sum())
+
+    # Monotonic Writes: consecutive writes by a client to a key must not change value
+    write_rows = np.flatnonzero(is_write_ok)
+    written_ok = pd.Series(written_arr[write_rows], dtype=object)
+    prev_write = written_ok.groupby(client_key_codes[write_rows], sort=False).shift()
+    monotonic_write_violations = int(
+        (prev_write.notna() & written_ok.notna() & (written_ok != prev_write)).sum()
+    )
 
-    consistency = {
+    return {
         "empty_reads": empty_reads,
         "multi_version_reads": multi_version_reads,
         "ryw_violations": ryw_violations,
@@ -325,11 +338,78 @@ def compute_metrics_from_workload(csv_path, warmup, failure_duration, exclude_no
     }
 
 
+def compute_metrics_from_workload(workload_path, warmup, failure_duration, exclude_nodes=None):
+    """
+    Robust metrics computation that correctly handles:
+      - multi-version reads (list of {value, vc, ts})
+      - Read-Your-Write: pass if any returned sibling equals client's last write
+      - Monotonic Reads: uses max returned ts to check monotonicity
+      - Monotonic Writes: basic check using last write tracking
+      - Time-windowed availability
+
+    The log is streamed column-wise with pandas (see _load_workload) and
+    reduced to flat integer/bool columns; the availability and consistency
+    reducers each receive only the columns they read.
+    """
+    cols = _load_workload(workload_path)
+    if cols is None:
+        return {}
+
+    ts_arr = cols["ts"]
+    op_arr = cols["op"]
+    success_arr = cols["success"]
+    n_rows = len(ts_arr)
+
+    # -------------------------------
+    # WINDOW BOUNDARIES
+    # -------------------------------
+    t0 = ts_arr[0]
+    warmup_end = t0 + warmup
+    failure_end = warmup_end + failure_duration
+
+    windows = {
+        "warmup":  {"start": t0, "end": warmup_end},
+        "failure": {"start": warmup_end, "end": failure_end},
+        "recovery": {"start": failure_end, "end": float("inf")}
+    }
+    window_names = list(windows)
+
+    # classify every row at once: bisect each ts against the window boundaries
+    # (rows are sorted by ts, so none is stamped before t0)
+    window_idx = np.searchsorted(np.array([warmup_end, failure_end]), ts_arr, side="right")
+
+    # -------------------------------
+    # INTEGER-ENCODED COLUMNS
+    # -------------------------------
+    exclude_nodes = set(exclude_nodes or [])
+    # membership is decided once per distinct node, then gathered per row
+    node_codes, node_ids = pd.factorize(cols["node"], use_na_sentinel=False)
+    excluded_ids = np.isin(node_ids.astype(object), list(exclude_nodes))
+    included = ~excluded_ids[node_codes]
+    is_read = op_arr == "READ"
+
+    # integer-encode clients and keys once; (client, key) groups use the
+    # combined int64 code so every groupby hashes a single int column
+    client_codes = pd.factorize(cols["client"])[0].astype(np.int64)
+    key_codes = pd.factorize(cols["key"])[0].astype(np.int64)
+    client_key_codes = (client_codes << 32) | key_codes
+
+    availability, windowed_availability = _availability_metrics(
+        window_idx, window_names, is_read, success_arr, included, n_rows
+    )
+
+    consistency = _consistency_metrics(
+        client_key_codes, key_codes,
+        is_read & success_arr, (op_arr == "WRITE") & success_arr,
+        cols["written"], cols["read_values"], cols["read_max_ts"],
+        cols["is_multi"], cols["best_read_value"],
+    )
+
     return {
         "availability": availability,
         "availability_by_window": windowed_availability,
         "consistency": consistency,
-        "total_ops": total_ops
+        "total_ops": n_rows
     }
 
 # helper to read cluster_procs.json
@@ -337,13 +417,11 @@ def read_cluster_procs(path="cluster_procs.json"):
     with open(path) as f:
         return json.load(f)  # node_id -> {"pid":..., "port":...}
 
-async def inject_delay(node_addr, delay_ms):
-    async with httpx.AsyncClient() as client:
-        await client.post(f"http://{node_addr}/control/delay", json={"delay_ms": delay_ms})
+async def inject_delay(client, node_addr, delay_ms):
+    await client.post(f"http://{node_addr}/control/delay", json={"delay_ms": delay_ms})
 
-async def clear_delay(node_addr):
-    async with httpx.AsyncClient() as client:
-        await client.post(f"http://{node_addr}/control/clear_delay")
+async def clear_delay(client, node_addr):
+    await client.post(f"http://{node_addr}/control/clear_delay")
 
 def kill_node(pid):
     try:
@@ -366,20 +444,19 @@ def start_workload_cmd(args, out_path, nodes_file):
     ]
     return subprocess.Popen(cmd)
 
-async def run_repair_rounds(sample_keys, replicas_of_key_fn_async, max_rounds=10):
+async def run_repair_rounds(client, sample_keys, replicas_of_key_fn_async, max_rounds=10, concurrency=16):
     """
     Perform synchronous rounds: for each round,
       - for each node that is a replica for the key, call repair_once on that node for that key
       - after the round, check how many replicas have same single version
     Return dictionary key -> hops_to_converge (or None if not converged)
+    Keys are independent, so up to `concurrency` of them are repaired at once.
     Note: replicas_of_key_fn_async(key) should be an async function returning list of node_addrs (host:port)
     """
-    results = {}
-    for key in sample_keys:
-        converged = False
-        for r in range(1, max_rounds+1):
-            # for each replica, call /repair_once/{key}
-            tasks = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def repair_key(key):
+        for rnd in range(1, max_rounds+1):
             try:
                 replicas = await replicas_of_key_fn_async(key)
             except Exception as e:
@@ -388,27 +465,28 @@ async def run_repair_rounds(sample_keys, replicas_of_key_fn_async, max_rounds=10
 
             if not replicas:
                 # can't repair if we don't know replicas
-                results[key] = None
-                break
+                return None
 
-            async with httpx.AsyncClient() as client:
-                for node in replicas:
-                    tasks.append(client.post(f"http://{node}/repair_once/{key}", timeout=5.0))
-                # run all
-                await asyncio.gather(*tasks, return_exceptions=True)
+            # for each replica, call /repair_once/{key}
+            await asyncio.gather(
+                *[client.post(f"http://{node}/repair_once/{key}", timeout=5.0) for node in replicas],
+                return_exceptions=True,
+            )
 
             # after round, check convergence: fetch versions from all replicas
-            async with httpx.AsyncClient() as client:
-                versions_list = []
-                for node in replicas:
-                    try:
-                        r = await client.get(f"http://{node}/get_local/{key}", timeout=3.0)
-                        if r.status_code == 200:
-                            versions_list.append(r.json().get("versions", []))
-                        else:
-                            versions_list.append([])
-                    except Exception:
+            responses = await asyncio.gather(
+                *[client.get(f"http://{node}/get_local/{key}", timeout=3.0) for node in replicas],
+                return_exceptions=True,
+            )
+            versions_list = []
+            for resp in responses:
+                try:
+                    if isinstance(resp, httpx.Response) and resp.status_code == 200:
+                        versions_list.append(resp.json().get("versions", []))
+                    else:
                         versions_list.append([])
+                except Exception:
+                    versions_list.append([])
 
             # check if all replicas have single identical version (compare vc)
             single_vcs = []
@@ -418,20 +496,24 @@ async def run_repair_rounds(sample_keys, replicas_of_key_fn_async, max_rounds=10
                 else:
                     single_vcs.append(None)
             if all(s is not None for s in single_vcs) and len(set(single_vcs)) == 1:
-                results[key] = r
-                converged = True
-                break
-        if not converged:
-            results[key] = None
-    return results
+                return rnd
+        return None
 
+    async def bounded(key):
+        async with sem:
+            return await repair_key(key)
+
+    hops = await asyncio.gather(*[bounded(key) for key in sample_keys])
+    return dict(zip(sample_keys, hops))
+
+@functools.lru_cache(maxsize=1 << 16)
 def replicas_from_ring(key, all_nodes, N):
     """
     Given the key, compute replica list using same consistent hashing logic as nodes,
     but as an approximation here we pick N nodes by hashing key modulo len(all_nodes) offsets.
     For accurate mapping, you may expose a /ring_lookup endpoint from a node to get true replicas.
+    Results are memoized, so all_nodes must be a tuple; the returned list is shared, don't mutate it.
     """
-    import hashlib
     h = int(hashlib.sha1(key.encode()).hexdigest(), 16)
     idx = h % len(all_nodes)
     out = []
@@ -439,108 +521,98 @@ def replicas_from_ring(key, all_nodes, N):
         out.append(all_nodes[(idx + i) % len(all_nodes)])
     return out
 
-async def wait_for_nodes_ready(all_nodes, max_attempts=60, delay=0.5):
+async def wait_for_nodes_ready(client, all_nodes, max_attempts=60, delay=0.5):
     """
     Wait for all nodes to be ready by pinging them.
     Returns True if all nodes are ready, False otherwise.
     """
     print(f"[driver] waiting for {len(all_nodes)} nodes to be ready...")
-    async with httpx.AsyncClient(timeout=2.0) as client:
-        not_ready_nodes = set(all_nodes)
-        for attempt in range(max_attempts):
-            ready_count = 0
-            tasks = []
-            node_to_task = {}
-            for node in all_nodes:
-                task = client.get(f"http://{node}/ping")
-                tasks.append(task)
-                node_to_task[node] = task
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            for node, result in zip(all_nodes, results):
-                if isinstance(result, httpx.Response) and result.status_code == 200:
-                    ready_count += 1
-                    not_ready_nodes.discard(node)
-            
-            if ready_count == len(all_nodes):
-                print(f"[driver] all {len(all_nodes)} nodes are ready after {attempt + 1} attempts")
-                return True
-            
-            # Print progress every 10 attempts
-            if (attempt + 1) % 10 == 0:
-                print(f"[driver] attempt {attempt + 1}/{max_attempts}: {ready_count}/{len(all_nodes)} nodes ready")
-            
-            if attempt < max_attempts - 1:
-                await asyncio.sleep(delay)
+    not_ready_nodes = set(all_nodes)
+    for attempt in range(max_attempts):
+        ready_count = 0
+        tasks = []
+        node_to_task = {}
+        for node in all_nodes:
+            task = client.get(f"http://{node}/ping", timeout=2.0)
+            tasks.append(task)
+            node_to_task[node] = task
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for node, result in zip(all_nodes, results):
+            if isinstance(result, httpx.Response) and result.status_code == 200:
+                ready_count += 1
+                not_ready_nodes.discard(node)
+        
+        if ready_count == len(all_nodes):
+            print(f"[driver] all {len(all_nodes)} nodes are ready after {attempt + 1} attempts")
+            return True
         
-        print(f"[driver] WARNING: only {ready_count}/{len(all_nodes)} nodes are ready after {max_attempts} attempts")
-        if not_ready_nodes:
-            print(f"[driver] Nodes not ready: {sorted(not_ready_nodes)}")
-        return ready_count == len(all_nodes)
+        # Print progress every 10 attempts
+        if (attempt + 1) % 10 == 0:
+            print(f"[driver] attempt {attempt + 1}/{max_attempts}: {ready_count}/{len(all_nodes)} nodes ready")
+        
+        if attempt < max_attempts - 1:
+            await asyncio.sleep(delay)
+    
+    print(f"[driver] WARNING: only {ready_count}/{len(all_nodes)} nodes are ready after {max_attempts} attempts")
+    if not_ready_nodes:
+        print(f"[driver] Nodes not ready: {sorted(not_ready_nodes)}")
+    return ready_count == len(all_nodes)
 
-async def prepopulate_cluster(all_nodes, keyspace, initial_value="INIT"):
+async def prepopulate_cluster(client, all_nodes, keyspace, initial_value="INIT", concurrency=64):
     """
     Write an initial value to every key in the keyspace.
     Only a single coordinator write is needed per key.
     This function retries failed writes a few times to improve robustness.
     """
     # Wait for nodes to be ready before prepopulating
-    if not await wait_for_nodes_ready(all_nodes):
+    if not await wait_for_nodes_ready(client, all_nodes):
         print("[driver] WARNING: some nodes may not be ready, proceeding with prepopulation anyway")
     
     print(f"[driver] prepopulating {keyspace} keys...")
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        batch = []
-        failed_keys = []
-        for k in range(1, keyspace + 1):
-            key = str(k)
-            coord = random.choice(all_nodes)
-            payload = {"value": initial_value}
-            batch.append((key, coord, client.put(f"http://{coord}/put/{key}", json=payload)))
-
-            # throttle large bursts
-            if len(batch) >= 200:
-                results = await asyncio.gather(*[req for _, _, req in batch], return_exceptions=True)
-                for (key, coord, _), result in zip(batch, results):
-                    if isinstance(result, Exception) or (isinstance(result, httpx.Response) and result.status_code != 200):
-                        failed_keys.append((key, coord, result))
-                batch = []
-
-        if batch:
-            results = await asyncio.gather(*[req for _, _, req in batch], return_exceptions=True)
-            for (key, coord, _), result in zip(batch, results):
-                if isinstance(result, Exception) or (isinstance(result, httpx.Response) and result.status_code != 200):
-                    failed_keys.append((key, coord, result))
+    # cap in-flight writes; a slot frees up as soon as any write finishes
+    sem = asyncio.Semaphore(concurrency)
+    payload = {"value": initial_value}
+
+    async def put_one(key, coord):
+        async with sem:
+            return await client.put(f"http://{coord}/put/{key}", json=payload)
+
+    targets = [(str(k), random.choice(all_nodes)) for k in range(1, keyspace + 1)]
+    results = await asyncio.gather(*[put_one(key, coord) for key, coord in targets], return_exceptions=True)
+    failed_keys = []
+    for (key, coord), result in zip(targets, results):
+        if isinstance(result, Exception) or (isinstance(result, httpx.Response) and result.status_code != 200):
+            failed_keys.append((key, coord, result))
 
     # Retry failed writes
     if failed_keys:
         print(f"[driver] retrying {len(failed_keys)} failed prepopulation writes...")
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            for key, coord, error in failed_keys:
+        for key, coord, error in failed_keys:
+            try:
+                payload = {"value": initial_value}
+                result = await client.put(f"http://{coord}/put/{key}", json=payload)
+                if result.status_code != 200:
+                    print(f"[driver] WARNING: retry failed for key {key} on {coord}: status {result.status_code}")
+            except Exception as e:
+                print(f"[driver] WARNING: retry failed for key {key} on {coord}: {e}")
+                # Try a different coordinator
                 try:
+                    alt_coord = random.choice([n for n in all_nodes if n != coord])
                     payload = {"value": initial_value}
-                    result = await client.put(f"http://{coord}/put/{key}", json=payload)
-                    if result.status_code != 200:
-                        print(f"[driver] WARNING: retry failed for key {key} on {coord}: status {result.status_code}")
-                except Exception as e:
-                    print(f"[driver] WARNING: retry failed for key {key} on {coord}: {e}")
-                    # Try a different coordinator
-                    try:
-                        alt_coord = random.choice([n for n in all_nodes if n != coord])
-                        payload = {"value": initial_value}
-                        result = await client.put(f"http://{alt_coord}/put/{key}", json=payload)
-                        if result.status_code == 200:
-                            print(f"[driver] successfully wrote key {key} via alternate coordinator {alt_coord}")
-                    except Exception as e2:
-                        print(f"[driver] ERROR: failed to prepopulate key {key} even with alternate coordinator: {e2}")
+                    result = await client.put(f"http://{alt_coord}/put/{key}", json=payload)
+                    if result.status_code == 200:
+                        print(f"[driver] successfully wrote key {key} via alternate coordinator {alt_coord}")
+                except Exception as e2:
+                    print(f"[driver] ERROR: failed to prepopulate key {key} even with alternate coordinator: {e2}")
 
     print("[driver] prepopulation complete.")
 
 # -------------------------
 # Helper: ask a coordinator for the true replica set for a key
 # -------------------------
-async def get_replicas_from_server(all_nodes, key, coordinator_index=0):
+async def get_replicas_from_server(client, all_nodes, key, coordinator_index=0):
     """
     Query a coordinator node for /replicas_for_key/{key}.
     all_nodes: list of node addrs (host:port)
@@ -551,16 +623,21 @@ async def get_replicas_from_server(all_nodes, key, coordinator_index=0):
         return []
     coord = all_nodes[coordinator_index]
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            r = await client.get(f"http://{coord}/replicas_for_key/{key}")
-            if r.status_code == 200:
-                js = r.json()
-                return js.get("replicas", [])
+        r = await client.get(f"http://{coord}/replicas_for_key/{key}", timeout=5.0)
+        if r.status_code == 200:
+            js = r.json()
+            return js.get("replicas", [])
     except Exception as e:
         print(f"[driver] get_replicas_from_server error contacting {coord} for key {key}: {e}")
     return []
 
 async def main(args):
+    # one pooled client for every control, prepopulate and repair request of the run
+    limits = httpx.Limits(max_connections=512, max_keepalive_connections=256)
+    async with httpx.AsyncClient(limits=limits, timeout=10.0) as client:
+        await run_experiment(args, client)
+
+async def run_experiment(args, client):
     # -------------------------
     # Create experiment result directory
     # -------------------------
@@ -597,11 +674,11 @@ async def main(args):
 
 
     # PREPOPULATE KEYSPACE
-    await prepopulate_cluster(all_nodes, args.keyspace)
+    await prepopulate_cluster(client, all_nodes, args.keyspace)
 
     # start workload subprocess
-    out_csv = os.path.join(exp_dir, "workload.csv")
-    p = start_workload_cmd(args, out_csv, all_nodes_path)
+    out_log = os.path.join(exp_dir, f"workload.{args.workload_format}")
+    p = start_workload_cmd(args, out_log, all_nodes_path)
     print("[driver] workload started, pid", p.pid)
     # schedule failure injection after warmup
     await asyncio.sleep(args.warmup)
@@ -630,12 +707,12 @@ async def main(args):
         # choose node and inject delay
         victim = random.choice(all_nodes)
         print("[driver] injecting delay on", victim)
-        await inject_delay(victim, args.slow_ms)
+        await inject_delay(client, victim, args.slow_ms)
     elif args.failure_mode == "single_partition":
         victim = random.choice(all_nodes)
         print("[driver] PARTITIONING node", victim)
         # For a strong partition, 60s delay makes node effectively unreachable
-        await inject_delay(victim, args.partition_ms)
+        await inject_delay(client, victim, args.partition_ms)
     else:
         print("[driver] no failure injected")
 
@@ -644,7 +721,7 @@ async def main(args):
 
     # heal: if slow, clear delay; if crash, cannot auto-restart here (user must restart)
     if args.failure_mode == "slow":
-        await clear_delay(victim)
+        await clear_delay(client, victim)
     elif args.failure_mode == "crash":
         if len(crashed_nodes) == 1:
             print(f"[driver] node {crashed_nodes[0]} was crashed; please restart cluster if you want to measure post-recovery repair.")
@@ -652,12 +729,12 @@ async def main(args):
             print(f"[driver] nodes {', '.join(crashed_nodes)} were crashed; please restart cluster if you want to measure post-recovery repair.")
     elif args.failure_mode == "single_partition":
         # print("[driver] healing partition on", victim)
-        # await clear_delay(victim)
+        # await clear_delay(client, victim)
         print("[driver] we decided not to heal the partition on", victim)
 
     # wait for workload to finish
     p.wait()
-    print("[driver] workload finished. saved to", out_csv)
+    print("[driver] workload finished. saved to", out_log)
 
     # now sample keys and run repair rounds if cluster is healed
     if args.post_repair and args.failure_mode != "crash":
@@ -666,10 +743,10 @@ async def main(args):
 
         # define async replica mapping function that queries the server
         async def replicas_fn_async(k):
-            return await get_replicas_from_server(all_nodes, k, coordinator_index=0)
+            return await get_replicas_from_server(client, all_nodes, k, coordinator_index=0)
 
         print("[driver] running repair rounds for sample keys...")
-        res = await run_repair_rounds(sample_keys, replicas_fn_async, max_rounds=args.max_repair_rounds)
+        res = await run_repair_rounds(client, sample_keys, replicas_fn_async, max_rounds=args.max_repair_rounds)
         # write repair results
         repair_path = os.path.join(exp_dir, "repair_results.json")
         with open(repair_path, "w") as f:
@@ -690,7 +767,7 @@ async def main(args):
             pass
 
         metrics = compute_metrics_from_workload(
-            out_csv,
+            out_log,
             warmup=args.warmup,
             failure_duration=args.failure_duration,
             exclude_nodes=exclude_nodes
@@ -714,6 +791,7 @@ if __name__ == "__main__":
     parser.add_argument("--concurrency", type=int, default=10)
     parser.add_argument("--dist", choices=["uniform","zipf"], default="uniform")
     parser.add_argument("--keyspace", type=int, default=200)
+    parser.add_argument("--workload_format", choices=["csv","parquet"], default="csv", help="Format of the workload log written by workload.py")
     parser.add_argument("--replication_factor", type=int, default=3)
     parser.add_argument("--read_quorum_r", type=int, default=2)
     parser.add_argument("--write_quorum_w", type=int, default=2)
@@ -731,4 +809,4 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    asyncio.run(main(args))
+    uvloop.run(main(args))
@@ -2,11 +2,29 @@
 import argparse
 import asyncio
 import csv
-import random
-import json
-from datetime import datetime
+import io
+import time
 import httpx
-from numpy.random import zipf
+import numpy as np
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# random draws are generated this many ops at a time per worker
+RNG_BATCH = 4096
+# rows each worker buffers before appending them to the shared output file
+FLUSH_ROWS = 1000
+
+COLUMNS = ["ts","worker","op","key","node","success","versions_or_vc"]
+PARQUET_SCHEMA = pa.schema([
+    ("ts", pa.float64()),
+    ("worker", pa.int64()),
+    ("op", pa.string()),
+    ("key", pa.string()),
+    ("node", pa.string()),
+    ("success", pa.bool_()),
+    ("versions_or_vc", pa.string()),  # orjson-serialized payload
+])
 
 # read nodes from file or CLI
 def load_nodes(args):
@@ -18,14 +36,27 @@ def load_nodes(args):
     else:
         raise RuntimeError("No nodes provided")
 
-def pick_key(distribution, keyspace):
+def pick_keys(rng, distribution, keyspace, size):
     if distribution == "uniform":
-        return str(random.randint(1, keyspace))
+        return rng.integers(1, keyspace + 1, size).astype(str)
     elif distribution == "zipf":
-        while True:
-            k = zipf(1.3)
-            if k <= keyspace:
-                return str(k)
+        # rejection sampling, a batch at a time: redraw until enough land in the keyspace
+        keys = np.empty(0, dtype=np.int64)
+        while len(keys) < size:
+            k = rng.zipf(1.3, size)
+            keys = np.concatenate([keys, k[k <= keyspace]])
+        return keys[:size].astype(str)
+
+def op_stream(nodes, op_ratio, dist, keyspace):
+    """Yield (node, key, is_read, value) per op, served from pre-drawn batches."""
+    rng = np.random.default_rng()
+    while True:
+        node_idx = rng.integers(0, len(nodes), RNG_BATCH)
+        keys = pick_keys(rng, dist, keyspace, RNG_BATCH)
+        is_read = rng.random(RNG_BATCH) < op_ratio
+        values = rng.integers(1, 10**9 + 1, RNG_BATCH).astype(str)
+        for i in range(RNG_BATCH):
+            yield nodes[node_idx[i]], str(keys[i]), bool(is_read[i]), str(values[i])
 
 async def do_get(client, node_url, key):
     try:
@@ -53,35 +84,64 @@ async def do_put(client, node_url, key, value):
         pass
     return False, None, None
 
-async def worker(worker_id, nodes, op_ratio, duration, dist, keyspace, csv_writer):
+def csv_rows_writer(out_file):
+    def write_rows(rows):
+        # format in one csv pass and append with a single write
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        out_file.write(buf.getvalue())
+    return write_rows
+
+def parquet_rows_writer(pq_writer):
+    def write_rows(rows):
+        # one typed row group per flush
+        columns = [pa.array(col, type=field.type) for col, field in zip(zip(*rows), PARQUET_SCHEMA)]
+        pq_writer.write_table(pa.Table.from_arrays(columns, schema=PARQUET_SCHEMA))
+    return write_rows
+
+def flush_rows(rows, write_rows):
+    """Hand a worker's buffered rows to the output writer and reset the buffer."""
+    # writers don't await, so rows from different workers never interleave
+    if rows:
+        write_rows(rows)
+    rows.clear()
+
+async def worker(worker_id, nodes, op_ratio, duration, dist, keyspace, write_rows):
     end = asyncio.get_event_loop().time() + duration
-    async with httpx.AsyncClient() as client:
-        while asyncio.get_event_loop().time() < end:
-            node = random.choice(nodes)
-            key = pick_key(dist, keyspace)
-            if random.random() < op_ratio:  # read
-                success, versions = await do_get(client, node, key)
-                csv_writer.writerow([
-                    datetime.now().isoformat(), worker_id, "READ", key, node, success, json.dumps(versions)
-                ])
-            else:
-                value = str(random.randint(1, 10**9))
-                success, used_vc, stored_version = await do_put(client, node, key, value)
-                csv_writer.writerow([
-                    datetime.now().isoformat(), worker_id, "WRITE", key, node, success, json.dumps(stored_version)
-                ])
+    ops = op_stream(nodes, op_ratio, dist, keyspace)
+    rows = []
+    try:
+        async with httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=64)) as client:
+            while asyncio.get_event_loop().time() < end:
+                node, key, is_read, value = next(ops)
+                if is_read:
+                    success, versions = await do_get(client, node, key)
+                    rows.append((time.time(), worker_id, "READ", key, node, success, orjson.dumps(versions).decode()))
+                else:
+                    success, used_vc, stored_version = await do_put(client, node, key, value)
+                    rows.append((time.time(), worker_id, "WRITE", key, node, success, orjson.dumps(stored_version).decode()))
+                if len(rows) >= FLUSH_ROWS:
+                    flush_rows(rows, write_rows)
+    finally:
+        flush_rows(rows, write_rows)
+
+async def run_workers(args, nodes, write_rows):
+    workers = []
+    read_ratio = 0.95 if args.workload=="B" else 0.5
+    for i in range(args.concurrency):
+        workers.append(worker(i, nodes, read_ratio, args.duration, args.dist, args.keyspace, write_rows))
+    await asyncio.gather(*workers)
 
 async def run(args):
     nodes = load_nodes(args)
-    # create output csv
-    with open(args.out, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["ts","worker","op","key","node","success","versions_or_vc"])
-        workers = []
-        read_ratio = 0.95 if args.workload=="B" else 0.5
-        for i in range(args.concurrency):
-            workers.append(worker(i, nodes, read_ratio, args.duration, args.dist, args.keyspace, writer))
-        await asyncio.gather(*workers)
+    # output format follows the --out extension: .parquet, otherwise csv
+    if args.out.endswith(".parquet"):
+        with pq.ParquetWriter(args.out, PARQUET_SCHEMA, compression="zstd") as pq_writer:
+            await run_workers(args, nodes, parquet_rows_writer(pq_writer))
+    else:
+        with open(args.out, "w", newline="") as f:
+            csv.writer(f).writerow(COLUMNS)
+            await run_workers(args, nodes, csv_rows_writer(f))
 
 if __name__ == "__main__":
     p = argparse.ArgumentParser()
@@ -92,6 +152,6 @@ if __name__ == "__main__":
     p.add_argument("--concurrency", type=int, default=10)
     p.add_argument("--dist", choices=["uniform","zipf"], default="uniform")
     p.add_argument("--keyspace", type=int, default=200)
-    p.add_argument("--out", type=str, default="workload_out.csv")
+    p.add_argument("--out", type=str, default="workload_out.csv", help="Output log; a .parquet suffix writes Parquet instead of CSV")
     args = p.parse_args()
     asyncio.run(run(args))
@@ -1,6 +1,7 @@
 # node/config.py
 
 import argparse
+import functools
 from typing import List
 
 
@@ -8,6 +9,7 @@ from typing import List
 # Parse CLI arguments (instead of Docker env variables)
 # -----------------------------------------------------
 
+@functools.lru_cache(maxsize=None)
 def parse_args():
     parser = argparse.ArgumentParser()
 
@@ -35,70 +37,82 @@ def parse_args():
     return parser.parse_args()
 
 
-# Load CLI args once
-args = parse_args()
+# CLI args are parsed lazily, on first access to any setting below (PEP 562
+# module __getattr__), so importing this module never touches sys.argv.
+# Each setting: module attribute -> how to derive it from the parsed args.
+_SETTINGS = {
+    "NODE_ID": lambda a: a.node_id,
+    "PORT": lambda a: a.port,
+    "ALL_NODES": lambda a: a.all_nodes.split(","),
+    "REPLICATION_FACTOR": lambda a: a.replication_factor,
+    "READ_QUORUM_R": lambda a: a.read_quorum,
+    "WRITE_QUORUM_W": lambda a: a.write_quorum,
+    "VNODES_PER_NODE": lambda a: a.vnodes_per_node,
+    "HEARTBEAT_INTERVAL": lambda a: a.heartbeat_interval,
+    "PING_TIMEOUT": lambda a: a.ping_timeout,
+    "REPLICATION_TIMEOUT": lambda a: a.replication_timeout,
+    "READ_TIMEOUT": lambda a: a.read_timeout,
+    "DEBUG": lambda a: a.debug,
+}
+
+
+def __getattr__(name: str):
+    if name not in _SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = _SETTINGS[name](parse_args())
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
 
 
 # -----------------------------------------------------
 # Node identity
 # -----------------------------------------------------
 
-NODE_ID: str = args.node_id       # e.g., "node3"
-PORT: int = args.port             # e.g., 8002
+NODE_ID: str                      # e.g., "node3"
+PORT: int                         # e.g., 8002
 
 # Full cluster membership list
-ALL_NODES: List[str] = args.all_nodes.split(",")
+ALL_NODES: List[str]
 
 
 # -----------------------------------------------------
 # Replication & quorum parameters
 # -----------------------------------------------------
 
-REPLICATION_FACTOR: int = args.replication_factor
-READ_QUORUM_R: int = args.read_quorum
-WRITE_QUORUM_W: int = args.write_quorum
-VNODES_PER_NODE: int = args.vnodes_per_node
+REPLICATION_FACTOR: int
+READ_QUORUM_R: int
+WRITE_QUORUM_W: int
+VNODES_PER_NODE: int
 
 
 # -----------------------------------------------------
 # Failure detector parameters
 # -----------------------------------------------------
 
-HEARTBEAT_INTERVAL: float = args.heartbeat_interval
-PING_TIMEOUT: float = args.ping_timeout
+HEARTBEAT_INTERVAL: float
+PING_TIMEOUT: float
 
 
 # -----------------------------------------------------
 # RPC timeouts
 # -----------------------------------------------------
 
-REPLICATION_TIMEOUT: float = args.replication_timeout
-READ_TIMEOUT: float = args.read_timeout
+REPLICATION_TIMEOUT: float
+READ_TIMEOUT: float
 
 
 # -----------------------------------------------------
 # Debug flag
 # -----------------------------------------------------
 
-DEBUG: bool = args.debug
+DEBUG: bool
 
 
 # -----------------------------------------------------
 # Utility function
 # -----------------------------------------------------
 
+@functools.lru_cache(maxsize=1)
 def dump_config() -> dict:
-    return {
-        "NODE_ID": NODE_ID,
-        "PORT": PORT,
-        "ALL_NODES": ALL_NODES,
-        "REPLICATION_FACTOR": REPLICATION_FACTOR,
-        "READ_QUORUM_R": READ_QUORUM_R,
-        "WRITE_QUORUM_W": WRITE_QUORUM_W,
-        "VNODES_PER_NODE": VNODES_PER_NODE,
-        "HEARTBEAT_INTERVAL": HEARTBEAT_INTERVAL,
-        "PING_TIMEOUT": PING_TIMEOUT,
-        "REPLICATION_TIMEOUT": REPLICATION_TIMEOUT,
-        "READ_TIMEOUT": READ_TIMEOUT,
-        "DEBUG": DEBUG
-    }
+    """All settings as a dict; built once, so treat the result as read-only."""
+    return {name: __getattr__(name) for name in _SETTINGS}
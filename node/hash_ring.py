@@ -1,14 +1,18 @@
 # node/hash_ring.py
-import hashlib
-import bisect
-from typing import List, Dict, Tuple, Optional, Set
+from typing import Dict, List, Tuple, Optional, Set
+
+import numpy as np
+import xxhash
 
 
 def _hash_fn(key: str) -> int:
-    """Return a stable integer hash for a string key (sha1 -> int)."""
-    h = hashlib.sha1()
-    h.update(key.encode("utf-8"))
-    return int(h.hexdigest(), 16)
+    """Return a stable 64-bit integer hash for a string key (xxh3; placement needs no crypto strength)."""
+    return xxhash.xxh3_64_intdigest(key.encode("utf-8"))
+
+
+def _vnode_hash(node_bytes: bytes, seed: int) -> int:
+    """Position of vnode `seed` of a node: the node id hashed with the vnode index as xxh3 seed."""
+    return xxhash.xxh3_64_intdigest(node_bytes, seed=seed)
 
 
 class HashRing:
@@ -22,9 +26,16 @@ class HashRing:
 
     def __init__(self, nodes: List[str], vnodes: int = 100):
         self.vnodes = vnodes
-        self._ring: List[int] = []                # sorted list of vnode positions (ints)
-        self._vnode_map: Dict[int, str] = {}      # position -> vnode_id (e.g. "node1#42")
-        self._vnode_to_node: Dict[str, str] = {}  # vnode_id -> physical node id
+        # sorted vnode positions (contiguous uint64, bisected with searchsorted)
+        # and, at the same index, the physical node owning each and its vnode
+        # seed (vnode_id is f"{node}#{seed}")
+        self._ring_arr = np.empty(0, dtype=np.uint64)
+        self._ring_node: List[str] = []
+        self._ring_seed: List[int] = []
+        # each physical node's bit in alive masks (see get_replicas_mask), and that
+        # bit for every vnode, parallel to _ring_node
+        self._node_bit: Dict[str, int] = {}
+        self._ring_bit: List[int] = []
         self._nodes: Set[str] = set()
         for n in nodes:
             self.add_node(n)
@@ -34,59 +45,108 @@ class HashRing:
         if node_id in self._nodes:
             return
         self._nodes.add(node_id)
+        bit = self._node_bit.setdefault(node_id, 1 << len(self._node_bit))
+        node_bytes = node_id.encode("utf-8")
+        taken = set(self._ring_arr.tolist())
+        new_pos: List[int] = []
+        new_seed: List[int] = []
         for i in range(self.vnodes):
-            vnode_id = f"{node_id}#{i}"
-            pos = _hash_fn(vnode_id)
-            # ensure uniqueness of pos (very unlikely collision with sha1)
-            while pos in self._vnode_map:
-                # perturb vnode_id and rehash (extremely unlikely)
-                vnode_id = vnode_id + "_"
-                pos = _hash_fn(vnode_id)
-            bisect.insort(self._ring, pos)
-            self._vnode_map[pos] = vnode_id
-            self._vnode_to_node[vnode_id] = node_id
+            seed = i
+            pos = _vnode_hash(node_bytes, seed)
+            # ensure uniqueness of pos (very unlikely 64-bit collision)
+            while pos in taken:
+                # move to a seed outside the regular 0..vnodes-1 range and rehash (extremely unlikely)
+                seed += self.vnodes
+                pos = _vnode_hash(node_bytes, seed)
+            taken.add(pos)
+            new_pos.append(pos)
+            new_seed.append(seed)
+        # merge the new vnodes in with one sort instead of an insert per vnode
+        positions = np.concatenate([self._ring_arr, np.asarray(new_pos, dtype=np.uint64)])
+        order = np.argsort(positions, kind="stable")
+        nodes = self._ring_node + [node_id] * len(new_pos)
+        seeds = self._ring_seed + new_seed
+        bits = self._ring_bit + [bit] * len(new_pos)
+        self._ring_arr = positions[order]
+        self._ring_node = [nodes[i] for i in order]
+        self._ring_seed = [seeds[i] for i in order]
+        self._ring_bit = [bits[i] for i in order]
 
     def remove_node(self, node_id: str):
         """Remove a physical node and all its vnodes."""
         if node_id not in self._nodes:
             return
         self._nodes.remove(node_id)
-        # remove vnodes
-        to_remove = [pos for pos, vnode in self._vnode_map.items()
-                     if self._vnode_to_node.get(vnode) == node_id]
-        for pos in to_remove:
-            # remove from ring list and maps
-            idx = bisect.bisect_left(self._ring, pos)
-            if idx < len(self._ring) and self._ring[idx] == pos:
-                self._ring.pop(idx)
-            self._vnode_map.pop(pos, None)
-            vnode = f"{node_id}#"  # not used further
-
-        # remove vnode->node entries
-        self._vnode_to_node = {v: n for v, n in self._vnode_to_node.items() if n != node_id}
+        # one filtering pass over the ring instead of a pop (and shift) per vnode
+        kept = [i for i, node in enumerate(self._ring_node) if node != node_id]
+        self._ring_arr = self._ring_arr[kept]
+        self._ring_node = [self._ring_node[i] for i in kept]
+        self._ring_seed = [self._ring_seed[i] for i in kept]
+        self._ring_bit = [self._ring_bit[i] for i in kept]
 
     def get_replicas(self, key: str, N: int = 3, alive_nodes: Optional[Set[str]] = None) -> List[str]:
         """
         Return up to N distinct physical node_ids that are the replicas for `key`.
         If alive_nodes is provided, only return nodes in that set (skip dead ones).
         """
-        if not self._ring:
+        if not self._ring_node:
             return []
+        # find insertion point
+        idx = int(np.searchsorted(self._ring_arr, np.uint64(_hash_fn(key)), side="right"))
+        return self._walk(idx, N, alive_nodes)
+
+    def get_replicas_batch(self, keys: List[str], N: int = 3, alive_nodes: Optional[Set[str]] = None) -> List[List[str]]:
+        """
+        get_replicas for many keys at once: all ring bisects run in a single
+        numpy searchsorted call, only the per-key clockwise walk stays in Python.
+        """
+        if not self._ring_node:
+            return [[] for _ in keys]
+        hashes = np.fromiter((_hash_fn(k) for k in keys), dtype=np.uint64, count=len(keys))
+        idxs = np.searchsorted(self._ring_arr, hashes, side="right")
+        return [self._walk(int(idx), N, alive_nodes) for idx in idxs]
+
+    def node_bits(self) -> Dict[str, int]:
+        """Bit of each physical node in the alive masks taken by get_replicas_mask."""
+        return dict(self._node_bit)
+
+    def get_replicas_mask(self, key: str, N: int, alive_mask: int) -> List[str]:
+        """
+        get_replicas with the alive set given as a bitmask over node_bits():
+        the walk tests and records nodes with integer ands/ors instead of set lookups.
+        """
+        ring_bits = self._ring_bit
+        ring_len = len(ring_bits)
+        if not ring_len or N <= 0:
+            return []
+        idx = int(np.searchsorted(self._ring_arr, np.uint64(_hash_fn(key)), side="right"))
+        ring_nodes = self._ring_node
+        res: List[str] = []
+        seen = 0
+        for step in range(ring_len):
+            i = (idx + step) % ring_len
+            bit = ring_bits[i]
+            if seen & bit:
+                continue
+            seen |= bit
+            if alive_mask & bit:
+                res.append(ring_nodes[i])
+                if len(res) >= N:
+                    break
+        return res
 
+    def _walk(self, idx: int, N: int, alive_nodes: Optional[Set[str]]) -> List[str]:
+        """Collect up to N distinct (alive) physical nodes clockwise from ring index idx."""
         desired = N
         res: List[str] = []
         seen_nodes: Set[str] = set()
-        key_pos = _hash_fn(key)
-        # find insertion point
-        idx = bisect.bisect(self._ring, key_pos)
-        ring_len = len(self._ring)
+        ring_nodes = self._ring_node
+        ring_len = len(ring_nodes)
 
         # Walk clockwise collecting distinct physical nodes
         i = idx
         while len(res) < desired and ring_len > 0:
-            pos = self._ring[i % ring_len]
-            vnode_id = self._vnode_map[pos]
-            node = self._vnode_to_node[vnode_id]
+            node = ring_nodes[i % ring_len]
             i += 1
             # skip duplicates (vnode -> same physical node)
             if node in seen_nodes:
@@ -110,4 +170,105 @@ class HashRing:
 
     def ring_snapshot(self) -> List[Tuple[int, str]]:
         """Return a snapshot list of (position, vnode_id) useful for debugging."""
-        return [(pos, self._vnode_map[pos]) for pos in self._ring]
+        return [
+            (pos, f"{node}#{seed}")
+            for pos, node, seed in zip(self._ring_arr.tolist(), self._ring_node, self._ring_seed)
+        ]
+
+
+_MASK64 = (1 << 64) - 1
+
+
+def _jump(key_hash: int, buckets: int) -> int:
+    """Jump consistent hash (Lamping & Veach): map a 64-bit hash to a bucket in [0, buckets)."""
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key_hash = (key_hash * 2862933555777941757 + 1) & _MASK64
+        j = int((b + 1) * (float(1 << 31) / float((key_hash >> 33) + 1)))
+    return b
+
+
+class JumpHashRing:
+    """
+    Consistent hashing with Jump Consistent Hash: no vnodes, O(1) memory per node.
+
+    Buckets are the physical nodes in sorted order and the list is append-only;
+    remove_node only marks a node dead, since shrinking the bucket list would
+    remap keys. Same interface as HashRing.
+    """
+
+    def __init__(self, nodes: List[str], vnodes: int = 100):
+        # vnodes is accepted for interface compatibility and ignored
+        self._buckets: List[str] = sorted(set(nodes))
+        self._nodes: Set[str] = set(self._buckets)
+        self._node_bit: Dict[str, int] = {node: 1 << i for i, node in enumerate(self._buckets)}
+
+    def add_node(self, node_id: str):
+        """Add a physical node (revives it if it was removed)."""
+        if node_id in self._nodes:
+            return
+        self._nodes.add(node_id)
+        if node_id not in self._buckets:
+            self._node_bit[node_id] = 1 << len(self._buckets)
+            self._buckets.append(node_id)
+
+    def remove_node(self, node_id: str):
+        """Mark a physical node dead; its bucket keeps its index."""
+        self._nodes.discard(node_id)
+
+    def get_replicas(self, key: str, N: int = 3, alive_nodes: Optional[Set[str]] = None) -> List[str]:
+        """
+        Return up to N distinct physical node_ids that are the replicas for `key`.
+        Replica i is the jump bucket of the key hash rehashed with i; dead or
+        duplicate buckets are skipped. If alive_nodes is provided, only return
+        nodes in that set.
+        """
+        buckets = self._buckets
+        n_buckets = len(buckets)
+        if not n_buckets:
+            return []
+
+        res: List[str] = []
+        seen_nodes: Set[str] = set()
+
+        def _take(node: str):
+            if node in seen_nodes or node not in self._nodes:
+                return
+            seen_nodes.add(node)
+            if alive_nodes is not None and node not in alive_nodes:
+                return
+            res.append(node)
+
+        key_hash = _hash_fn(key)
+        # rehash a bounded number of times, then fall back to a linear scan so
+        # the result is still deterministic when most buckets are skipped
+        for i in range(4 * n_buckets):
+            if len(res) >= N:
+                return res
+            _take(buckets[_jump(key_hash ^ i, n_buckets)])
+        for node in buckets:
+            if len(res) >= N:
+                break
+            _take(node)
+        return res
+
+    def node_bits(self) -> Dict[str, int]:
+        """Bit of each physical node in the alive masks taken by get_replicas_mask (its bucket index)."""
+        return dict(self._node_bit)
+
+    def get_replicas_mask(self, key: str, N: int, alive_mask: int) -> List[str]:
+        """get_replicas with the alive set given as a bitmask over node_bits()."""
+        alive = {node for node, bit in self._node_bit.items() if alive_mask & bit}
+        return self.get_replicas(key, N=N, alive_nodes=alive)
+
+    def get_replicas_batch(self, keys: List[str], N: int = 3, alive_nodes: Optional[Set[str]] = None) -> List[List[str]]:
+        """get_replicas for many keys (jump lookups have no bisect to batch)."""
+        return [self.get_replicas(k, N=N, alive_nodes=alive_nodes) for k in keys]
+
+    def all_nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def ring_snapshot(self) -> List[Tuple[int, str]]:
+        """Return a snapshot list of (bucket, node_id) for live nodes, useful for debugging."""
+        return [(i, node) for i, node in enumerate(self._buckets) if node in self._nodes]
@@ -2,10 +2,12 @@
 
 import asyncio
 import aiohttp
+import itertools
+import orjson
 import random
 import time
 import logging
-from typing import Dict, Set, List
+from typing import Callable, Dict, Set, List, Optional
 
 HEARTBEAT_INTERVAL = 1.0
 FAIL_THRESHOLD = 3
@@ -14,12 +16,77 @@ HTTP_TIMEOUT = 0.4
 GOSSIP_INTERVAL = 1.5
 MEMBERSHIP_TTL = 10.0
 
+# at most this many probes in flight; probes are spread across each heartbeat
+MAX_INFLIGHT_PROBES = 32
+# peers contacted in parallel per gossip round
+GOSSIP_FANOUT = 2
+
+# keep-alive pool shared by all probes and gossip rounds
+CONNECTOR_LIMIT = 256
+CONNECTOR_LIMIT_PER_HOST = 4
+KEEPALIVE_TIMEOUT = 60
+CONNECT_TIMEOUT = 0.1
+
+# UDP liveness probes: 1-byte kind + 4-byte sequence number, echoed back
+UDP_PING = b"P"
+UDP_ACK = b"A"
+# peers that answer HTTP but miss this many UDP probes in a row are probed over HTTP only
+UDP_FALLBACK_AFTER = 3
+
+# gossip bodies are encoded with orjson rather than aiohttp's stdlib json
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 # ----------------------------------------
 # Logger for this module
 # ----------------------------------------
 membership_logger = logging.getLogger("membership")
 
 
+class _ProbeProtocol(asyncio.DatagramProtocol):
+    """Echoes UDP pings and resolves the pending future for each ack."""
+
+    def __init__(self, pending: Dict[int, asyncio.Future]):
+        self.pending = pending
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr):
+        if len(data) != 5:
+            return
+        kind, seq = data[:1], data[1:]
+        if kind == UDP_PING:
+            self.transport.sendto(UDP_ACK + seq, addr)
+        elif kind == UDP_ACK:
+            fut = self.pending.pop(int.from_bytes(seq, "big"), None)
+            if fut is not None and not fut.done():
+                fut.set_result(True)
+
+
+class Entry:
+    """
+    One membership row. Rows are converted to plain dicts only at the JSON
+    boundary (gossip messages and get_membership).
+    """
+    __slots__ = ("status", "incarnation", "timestamp")
+
+    def __init__(self, status: str, incarnation: int, timestamp: float):
+        self.status = status
+        self.incarnation = incarnation
+        self.timestamp = timestamp
+
+    def version(self) -> tuple:
+        return (self.incarnation, self.timestamp)
+
+    def as_dict(self) -> dict:
+        return {"status": self.status, "incarnation": self.incarnation, "timestamp": self.timestamp}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Entry":
+        return cls(data["status"], data["incarnation"], data["timestamp"])
+
+
 class MembershipService:
     """
     Handles:
@@ -27,105 +94,234 @@ class MembershipService:
       ✔ Gossip-based membership convergence
     """
 
-    def __init__(self, self_id: str, peers: List[str]):
+    def __init__(self, self_id: str, peers: List[str], udp_port: Optional[int] = None, udp_host: str = "127.0.0.1",
+                 node_bits: Optional[Dict[str, int]] = None):
         self.self_id = self_id
         self.peers = [p for p in peers if p != self_id]
 
+        # wall-clock timestamps: they are gossiped and compared across hosts
         now = time.time()
-        self.membership: Dict[str, dict] = {
-            self_id: {
-                "status": "alive",
-                "incarnation": 1,
-                "timestamp": now,
-            }
+        self.membership: Dict[str, Entry] = {
+            self_id: Entry("alive", 1, now)
         }
 
         # initialize peers as "alive"
         for p in self.peers:
-            self.membership[p] = {
-                "status": "alive",
-                "incarnation": 1,
-                "timestamp": now,
-            }
+            self.membership[p] = Entry("alive", 1, now)
 
         self.fail_counts = {p: 0 for p in self.peers}
         self._running = False
+        # created in run(), on the loop the probes run on
+        self._probe_sem: Optional[asyncio.Semaphore] = None
+
+        # alive set kept in step with status changes instead of rescanning the table
+        self._alive_cache: Set[str] = {
+            node for node, entry in self.membership.items() if entry.status == "alive"
+        }
+        # the same set as a bitmask over node_bits (e.g. the ring's node_bits());
+        # nodes without a bit are left out of the mask
+        self._node_bits: Dict[str, int] = dict(node_bits or {})
+        self.alive_mask = 0
+        for node in self._alive_cache:
+            self.alive_mask |= self._node_bits.get(node, 0)
+        # gossip targets (alive minus self), rebuilt only after the alive set changes
+        self._alive_peers_tuple: tuple = ()
+        self._alive_peers_dirty = True
+        # called with no arguments after every alive-set change
+        self._alive_listeners: List[Callable[[], None]] = []
+
+        # UDP failure detector (disabled when no udp_port is given)
+        self.udp_port = udp_port
+        self.udp_host = udp_host
+        self._udp_transport = None
+        self._udp_pending: Dict[int, asyncio.Future] = {}
+        self._udp_seq = itertools.count()
+        self._udp_misses = {p: 0 for p in self.peers}
 
     # ---------------------------------------------------------
     # Public API
     # ---------------------------------------------------------
 
     def alive_nodes(self) -> Set[str]:
-        return {
-            node for node, data in self.membership.items()
-            if data["status"] == "alive"
-        }
+        """Nodes currently believed alive. This is the live cached set: read it, don't mutate it."""
+        return self._alive_cache
 
-    def get_membership(self):
-        return self.membership
+    def get_membership(self) -> Dict[str, dict]:
+        return {node: entry.as_dict() for node, entry in self.membership.items()}
 
     # ---------------------------------------------------------
     # Failure Detector
     # ---------------------------------------------------------
 
-    async def _probe_once(self, session, peer: str):
+    async def _udp_ping(self, peer: str) -> bool:
+        """Send one UDP ping to the peer's port and wait for the echoed sequence number."""
+        host, port = peer.rsplit(":", 1)
+        seq = next(self._udp_seq) & 0xFFFFFFFF
+        fut = asyncio.get_running_loop().create_future()
+        self._udp_pending[seq] = fut
+        try:
+            self._udp_transport.sendto(UDP_PING + seq.to_bytes(4, "big"), (host, int(port)))
+            return await asyncio.wait_for(fut, HTTP_TIMEOUT)
+        except (asyncio.TimeoutError, OSError):
+            return False
+        finally:
+            self._udp_pending.pop(seq, None)
+
+    async def _http_ping(self, session, peer: str) -> bool:
         url = f"http://{peer}/ping"
-
         try:
-            async with session.get(url, timeout=HTTP_TIMEOUT) as resp:
-                if resp.status == 200:
-                    # reset failures
-                    if self.fail_counts[peer] > 0:
-                        membership_logger.debug(f"{peer} responded again (reset fail count).")
-                    self.fail_counts[peer] = 0
-                    self._mark_alive(peer)
-                    return
+            async with session.get(url) as resp:
+                return resp.status == 200
         except Exception:
-            pass
+            return False
+
+    async def _probe_once(self, session, peer: str, delay: float = 0.0):
+        # staggered start, then a bounded number of probes in flight
+        if delay:
+            await asyncio.sleep(delay)
+        async with self._probe_sem:
+            await self._probe(session, peer)
+
+    async def _probe(self, session, peer: str):
+        use_udp = self._udp_transport is not None and self._udp_misses[peer] < UDP_FALLBACK_AFTER
+        ok = use_udp and await self._udp_ping(peer)
+        if not ok:
+            ok = await self._http_ping(session, peer)
+            if ok and use_udp:
+                # peer is up but UDP isn't getting through
+                self._udp_misses[peer] += 1
+                if self._udp_misses[peer] >= UDP_FALLBACK_AFTER:
+                    membership_logger.debug(f"{peer} unreachable over UDP; probing over HTTP only.")
+        elif self._udp_misses[peer]:
+            self._udp_misses[peer] = 0
+
+        if ok:
+            # reset failures
+            if self.fail_counts[peer] > 0:
+                membership_logger.debug(f"{peer} responded again (reset fail count).")
+            self.fail_counts[peer] = 0
+            self._mark_alive(peer)
+            return
 
         # failure
         self.fail_counts[peer] += 1
         membership_logger.debug(f"{peer} ping failed (count={self.fail_counts[peer]}).")
 
         if self.fail_counts[peer] >= FAIL_THRESHOLD:
-            if self.membership[peer]["status"] != "dead":
+            if self.membership[peer].status != "dead":
                 membership_logger.debug(f"{peer} marked DEAD after {FAIL_THRESHOLD} failures.")
             self._mark_dead(peer)
 
     def _mark_dead(self, node: str):
         entry = self.membership[node]
-        entry["status"] = "dead"
-        entry["timestamp"] = time.time()
+        entry.status = "dead"
+        entry.timestamp = time.time()
+        self._set_alive(node, False)
 
     def _mark_alive(self, node: str):
         entry = self.membership[node]
         # log only if transitioning from dead → alive
-        if entry["status"] == "dead":
+        if entry.status == "dead":
             membership_logger.debug(f"{node} recovered → marked ALIVE again.")
-        entry["status"] = "alive"
-        entry["timestamp"] = time.time()
+        entry.status = "alive"
+        entry.timestamp = time.time()
+        self._set_alive(node, True)
+
+    def _set_entry(self, node: str, data: dict):
+        """Adopt a membership entry learned through gossip, updating a known row in place."""
+        entry = self.membership.get(node)
+        if entry is None:
+            entry = self.membership[node] = Entry.from_dict(data)
+        else:
+            entry.status, entry.incarnation, entry.timestamp = data["status"], data["incarnation"], data["timestamp"]
+        self._set_alive(node, entry.status == "alive")
+
+    def _set_alive(self, node: str, alive: bool):
+        if alive == (node in self._alive_cache):
+            return
+        bit = self._node_bits.get(node, 0)
+        if alive:
+            self._alive_cache.add(node)
+            self.alive_mask |= bit
+        else:
+            self._alive_cache.discard(node)
+            self.alive_mask &= ~bit
+        self._alive_peers_dirty = True
+        for listener in self._alive_listeners:
+            listener()
+
+    def add_alive_listener(self, listener: Callable[[], None]):
+        """Register a callback run whenever a node becomes alive or dead."""
+        self._alive_listeners.append(listener)
 
     # ---------------------------------------------------------
     # Gossip
     # ---------------------------------------------------------
 
     async def _gossip_once(self, session):
-        peers = list(self.alive_nodes() - {self.self_id})
+        if self._alive_peers_dirty:
+            self._alive_peers_tuple = tuple(self._alive_cache - {self.self_id})
+            self._alive_peers_dirty = False
+        peers = self._alive_peers_tuple
         if not peers:
             return
 
-        peer = random.choice(peers)
+        targets = random.sample(peers, min(GOSSIP_FANOUT, len(peers)))
+        await asyncio.gather(*(self._gossip_with(session, peer) for peer in targets))
+
+    async def _gossip_with(self, session, peer: str):
         url = f"http://{peer}/gossip"
 
+        # push-pull: send our digest, merge the entries the peer has newer,
+        # then push back only the entries the peer asked for
         try:
-            async with session.post(url, json=self.membership, timeout=HTTP_TIMEOUT) as resp:
-                if resp.status == 200:
-                    remote_view = await resp.json()
-                    membership_logger.debug(f"Gossip with {peer} succeeded.")
-                    self._merge(remote_view)
+            async with session.post(url, data=orjson.dumps({"digest": self._digest()}), headers=JSON_HEADERS) as resp:
+                if resp.status != 200:
+                    return
+                reply = orjson.loads(await resp.read())
+            self._merge(reply.get("updates", {}))
+
+            wants = [n for n in reply.get("wants", []) if n in self.membership]
+            if wants:
+                updates = {n: self.membership[n].as_dict() for n in wants}
+                async with session.post(url, data=orjson.dumps({"updates": updates}), headers=JSON_HEADERS) as resp:
+                    resp.raise_for_status()
+            membership_logger.debug(f"Gossip with {peer} succeeded.")
         except Exception:
             membership_logger.debug(f"Gossip to {peer} failed.")
 
+    def _digest(self) -> Dict[str, tuple]:
+        """Per-node (incarnation, timestamp) summary of our table."""
+        return {node: entry.version() for node, entry in self.membership.items()}
+
+    def handle_gossip(self, message: dict) -> dict:
+        """
+        Serve one gossip message from a peer and return the reply body.
+          {"digest": {node: [inc, ts]}} -> {"updates": entries newer than the digest,
+                                            "wants": nodes the digest has newer}
+          {"updates": {node: entry}}    -> {} after merging them
+        A bare membership table (old full-state gossip) is merged and answered with ours.
+        """
+        if "digest" not in message and "updates" not in message:
+            self._merge(message)
+            return self.get_membership()
+
+        if message.get("updates"):
+            self._merge(message["updates"])
+
+        reply = {}
+        digest = message.get("digest")
+        if digest is not None:
+            reply["updates"] = {
+                node: entry.as_dict() for node, entry in self.membership.items()
+                if node not in digest or entry.version() > tuple(digest[node])
+            }
+            reply["wants"] = [
+                node for node, version in digest.items()
+                if node not in self.membership or tuple(version) > self.membership[node].version()
+            ]
+        return reply
+
     # ---------------------------------------------------------
     # Merge membership tables
     # ---------------------------------------------------------
@@ -135,42 +331,83 @@ class MembershipService:
 
             if node not in self.membership:
                 membership_logger.debug(f"New node {node} discovered through gossip.")
-                self.membership[node] = remote_data
+                self._set_entry(node, remote_data)
                 continue
 
             local_data = self.membership[node]
 
             # incarnation takes priority
-            if remote_data["incarnation"] > local_data["incarnation"]:
+            if remote_data["incarnation"] > local_data.incarnation:
                 membership_logger.debug(f"Update {node}: higher incarnation received.")
-                self.membership[node] = remote_data
+                self._set_entry(node, remote_data)
 
-            elif remote_data["incarnation"] == local_data["incarnation"]:
+            elif remote_data["incarnation"] == local_data.incarnation:
                 # break ties using timestamp
-                if remote_data["timestamp"] > local_data["timestamp"]:
+                if remote_data["timestamp"] > local_data.timestamp:
                     membership_logger.debug(f"Update {node}: newer timestamp received.")
-                    self.membership[node] = remote_data
+                    self._set_entry(node, remote_data)
 
     # ---------------------------------------------------------
     # Background tasks
     # ---------------------------------------------------------
 
+    @staticmethod
+    def _new_session() -> aiohttp.ClientSession:
+        """
+        One pooled session for the service's lifetime: connections to peers
+        are kept alive across heartbeats, and the timeout is set once here
+        instead of per request.
+        """
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTOR_LIMIT,
+            limit_per_host=CONNECTOR_LIMIT_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            enable_cleanup_closed=True,
+            ttl_dns_cache=300,
+        )
+        timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT, connect=CONNECT_TIMEOUT, sock_connect=CONNECT_TIMEOUT)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def _start_udp(self):
+        """Bind the UDP probe endpoint; on failure, probes stay on HTTP."""
+        if self.udp_port is None:
+            return
+        try:
+            transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                lambda: _ProbeProtocol(self._udp_pending),
+                local_addr=(self.udp_host, self.udp_port),
+            )
+            self._udp_transport = transport
+        except OSError as e:
+            membership_logger.warning(f"UDP probe endpoint unavailable ({e}); using HTTP pings.")
+
     async def run(self):
         """Main loop for pings + gossip."""
         self._running = True
+        self._probe_sem = asyncio.Semaphore(MAX_INFLIGHT_PROBES)
+        await self._start_udp()
 
-        async with aiohttp.ClientSession() as session:
-            while self._running:
-
-                # 1. Ping peers
-                await asyncio.gather(
-                    *(self._probe_once(session, peer) for peer in self.peers)
-                )
-
-                # 2. Gossip
-                await self._gossip_once(session)
-
-                await asyncio.sleep(HEARTBEAT_INTERVAL)
+        try:
+            async with self._new_session() as session:
+                loop = asyncio.get_running_loop()
+                while self._running:
+                    started = loop.time()
+
+                    # 1. Ping peers, spread evenly over the heartbeat interval
+                    step = HEARTBEAT_INTERVAL / max(len(self.peers), 1)
+                    await asyncio.gather(
+                        *(self._probe_once(session, peer, i * step) for i, peer in enumerate(self.peers))
+                    )
+
+                    # 2. Gossip
+                    await self._gossip_once(session)
+
+                    # keep one round per interval; the stagger already used part of it
+                    await asyncio.sleep(max(0.0, HEARTBEAT_INTERVAL - (loop.time() - started)))
+        finally:
+            if self._udp_transport is not None:
+                self._udp_transport.close()
+                self._udp_transport = None
 
     def stop(self):
         self._running = False
@@ -1,18 +1,21 @@
 # node/node.py
 import os
 import asyncio
+import functools
 from typing import List, Dict, Any
-from fastapi import FastAPI, Request, HTTPException, Body
+from fastapi import FastAPI, Request, HTTPException, Body, Response
+from fastapi.responses import ORJSONResponse
 import uvicorn
-import httpx
 import argparse
+import orjson
+import msgpack
 
 # local module imports (assumed present in node/ package)
-from hash_ring import HashRing
+from hash_ring import HashRing, JumpHashRing
 from membership import MembershipService
 from vector_clock import VectorClock
-from storage import put_local, get_local_versions, merge_remote_versions, overwrite_local_versions
-from replication import quorum_write, quorum_read
+from storage import put_local, get_local_versions_readonly, merge_remote_versions, overwrite_local_versions, drop_dominated, public_versions, latest_local_version
+from replication import quorum_write, quorum_read, RPC_CLIENT, JSON_HEADERS, close_rpc_client, start_read_repair_workers, batch_payload
 
 def parse_args():
     parser = argparse.ArgumentParser()
@@ -27,6 +30,8 @@ def parse_args():
     parser.add_argument("--read_quorum_r", type=int, default=2)
     parser.add_argument("--write_quorum_w", type=int, default=2)
     parser.add_argument("--vnodes_per_node", type=int, default=100)
+    parser.add_argument("--ring", choices=["vnode", "jump"], default="vnode",
+                        help="Key placement: vnode consistent-hash ring or jump consistent hash")
 
     parser.add_argument("--heartbeat_interval", type=float, default=1.0)
     parser.add_argument("--ping_timeout", type=float, default=1.5)
@@ -40,41 +45,57 @@ def parse_args():
 
 args = parse_args()
 NODE_ID = args.node_id
+# HTTP server and UDP probe endpoint both listen on loopback only
+HOST = "127.0.0.1"
 PORT = args.port
 ALL_NODES = args.all_nodes.split(",")
+# this node's own entry in ALL_NODES (ring members are host:port addresses, not NODE_ID)
+SELF_ADDR = next((n for n in ALL_NODES if n.rsplit(":", 1)[-1] == str(PORT)), None)
 REPLICATION_FACTOR = args.replication_factor
 READ_QUORUM_R = args.read_quorum_r
 WRITE_QUORUM_W = args.write_quorum_w
 VNODES_PER_NODE = args.vnodes_per_node
+RING_IMPL = {"vnode": HashRing, "jump": JumpHashRing}[args.ring]
 
 # ---------- Globals ----------
-app = FastAPI(title=f"dynamo-node-{NODE_ID}")
+# responses are encoded with orjson; hot-path request bodies are decoded with orjson.loads
+app = FastAPI(title=f"dynamo-node-{NODE_ID}", default_response_class=ORJSONResponse)
 
 # instantiate ring and membership service
-global_ring = HashRing(nodes=ALL_NODES, vnodes=VNODES_PER_NODE)
-membership_service = MembershipService(self_id=NODE_ID, peers=ALL_NODES)
+global_ring = RING_IMPL(nodes=ALL_NODES, vnodes=VNODES_PER_NODE)
+membership_service = MembershipService(self_id=NODE_ID, peers=ALL_NODES, udp_port=PORT, udp_host=HOST,
+                                       node_bits=global_ring.node_bits())
+
+# replica lists per key. The ring never changes after startup, so full-ring
+# lookups are cached for good; alive-filtered ones are dropped whenever the
+# alive set changes. Cached lists are shared: don't mutate them.
+@functools.lru_cache(maxsize=8192)
+def _ring_replicas(key: str) -> List[str]:
+    return global_ring.get_replicas(key, N=REPLICATION_FACTOR, alive_nodes=None)
+
+@functools.lru_cache(maxsize=8192)
+def _alive_replicas(key: str) -> List[str]:
+    return global_ring.get_replicas_mask(key, N=REPLICATION_FACTOR, alive_mask=membership_service.alive_mask)
+
+membership_service.add_alive_listener(_alive_replicas.cache_clear)
 
 # node-level variable for artificial delay (ms)
+# handlers check it inline so that with no delay they don't yield to the
+# event loop at all (an unconditional asyncio.sleep(0) would)
 _REQUEST_DELAY_MS = 0  # 0 = no delay
 
 # ---------- Helper utilities ----------
-def _maybe_sleep():
-    """Return coroutine that sleeps if delay set."""
-    if _REQUEST_DELAY_MS and _REQUEST_DELAY_MS > 0:
-        return asyncio.sleep(_REQUEST_DELAY_MS / 1000.0)
-    return asyncio.sleep(0)  # no-op awaitable
-
 def _latest_local_vc(key: str):
     """
     Return the VC dict of the newest version stored locally for 'key',
     or None if none exist.
     """
-    versions = get_local_versions(key)
-    if not versions:
-        return None
-    # pick version with max ts
-    latest = max(versions, key=lambda v: v.get("ts", 0))
-    return latest.get("vc")
+    latest = latest_local_version(key)
+    return latest.get("vc") if latest else None
+
+def _local_only(candidates: List[str], quorum: int) -> bool:
+    """True when this node is the whole replica set and one answer is a quorum: no RPCs needed."""
+    return quorum <= 1 and len(candidates) == 1 and candidates[0] == SELF_ADDR
 
 # ---------- Health endpoint ----------
 @app.get("/ping")
@@ -101,7 +122,7 @@ def ring_lookup(key: str):
     Return the preference list (replica nodes) for a key using the current ring.
     This does not filter by alive nodes (use alive_nodes if desired).
     """
-    replicas = global_ring.get_replicas(key, N=REPLICATION_FACTOR, alive_nodes=None)
+    replicas = _ring_replicas(key)
     return {"key": key, "replicas": replicas, "N": REPLICATION_FACTOR}
 
 # ---------- Internal RPC: replicate (accept a version) ----------
@@ -112,8 +133,9 @@ async def replicate_endpoint(req: Request):
     Payload expected: {"key": <str>, "value": <str>, "vc": {node->count}}
     Stores version locally (append) and returns 200.
     """
-    await _maybe_sleep()
-    body = await req.json()
+    if _REQUEST_DELAY_MS > 0:
+        await asyncio.sleep(_REQUEST_DELAY_MS / 1000.0)
+    body = orjson.loads(await req.body())
     key = body.get("key")
     value = body.get("value")
     vc_dict = body.get("vc", {})
@@ -125,6 +147,24 @@ async def replicate_endpoint(req: Request):
     put_local(key, value, vc)
     return {"status": "ok", "node": NODE_ID}
 
+@app.put("/replicate_batch")
+async def replicate_batch_endpoint(req: Request):
+    """
+    Accept several versions of one key in a single RPC (read repair, repair_once).
+    Payload expected: {"key": <str>, "versions": [{"value": <str>, "vc": {node->count}}, ...]}
+    """
+    if _REQUEST_DELAY_MS > 0:
+        await asyncio.sleep(_REQUEST_DELAY_MS / 1000.0)
+    body = orjson.loads(await req.body())
+    key = body.get("key")
+    versions = body.get("versions")
+    if key is None or versions is None or any(v.get("value") is None for v in versions):
+        raise HTTPException(status_code=400, detail="key & versions (with values) required")
+
+    for v in versions:
+        put_local(key, v["value"], VectorClock.from_dict(v.get("vc", {})))
+    return {"status": "ok", "node": NODE_ID, "stored": len(versions)}
+
 # ---------- Internal RPC: get local versions ----------
 @app.get("/get_local/{key}")
 async def get_local_endpoint(key: str):
@@ -132,38 +172,46 @@ async def get_local_endpoint(key: str):
     Return local versions for a key in the form:
     {"versions": [ { "value": ..., "vc": {...}, "ts": ... }, ... ] }
     """
-    versions = get_local_versions(key)
-    return {"versions": versions}
+    versions = get_local_versions_readonly(key)
+    return {"versions": public_versions(versions)}
+
+@app.get("/get_local_mp/{key}")
+async def get_local_mp_endpoint(key: str):
+    """
+    Same versions as /get_local, as a bare MessagePack list; quorum reads use
+    this one, /get_local stays JSON for debugging clients.
+    """
+    versions = get_local_versions_readonly(key)
+    return Response(content=msgpack.packb(public_versions(versions)), media_type="application/x-msgpack")
 
 # ---------- Client-facing API: PUT (coordination + quorum write) ----------
 @app.put("/put/{key}")
 async def put_handler(key: str, req: Request):
-    await _maybe_sleep()
-    body = await req.json()
+    if _REQUEST_DELAY_MS > 0:
+        await asyncio.sleep(_REQUEST_DELAY_MS / 1000.0)
+    body = orjson.loads(await req.body())
     value = body.get("value")
 
     if value is None:
         raise HTTPException(status_code=400, detail="value required")
 
     # Determine replication set
-    alive = (
-        membership_service.alive_nodes()
-        if callable(getattr(membership_service, "alive_nodes", None))
-        else membership_service.alive_nodes
-    )
-    candidates = global_ring.get_replicas(
-        key, N=REPLICATION_FACTOR, alive_nodes=alive
-    )
+    candidates = _alive_replicas(key)
+
+    local_only = _local_only(candidates, max(READ_QUORUM_R, WRITE_QUORUM_W))
 
     # --------------------------------------------------------------
     # 1. QUORUM READ TO FETCH PARENT VERSIONS
     # --------------------------------------------------------------
-    ok, parent_versions, responders = await quorum_read(
-        key=key,
-        candidates=candidates,
-        R=READ_QUORUM_R,
-        do_read_repair=True   # automatically keeps replicas synced
-    )
+    if local_only:
+        ok, parent_versions, responders = True, get_local_versions_readonly(key), candidates
+    else:
+        ok, parent_versions, responders = await quorum_read(
+            key=key,
+            candidates=candidates,
+            R=READ_QUORUM_R,
+            do_read_repair=True   # automatically keeps replicas synced
+        )
 
     # If no quorum read, treat as empty parent set
     if not ok:
@@ -188,14 +236,21 @@ async def put_handler(key: str, req: Request):
     # --------------------------------------------------------------
     # 4. QUORUM WRITE WITH NEW VEC CLOCK
     # --------------------------------------------------------------
-    success, succeeded, failed, stored_version = await quorum_write(
-        key=key,
-        value=value,
-        candidates=candidates,
-        W=WRITE_QUORUM_W,
-        local_node_id=NODE_ID,
-        parent_vc=parent_vc
-    )
+    if local_only:
+        # same clock quorum_write would use (it increments a copy of parent_vc)
+        vc = parent_vc.copy()
+        vc.increment(NODE_ID)
+        stored_version = put_local(key, value, vc)
+        success, succeeded, failed = True, [NODE_ID], []
+    else:
+        success, succeeded, failed, stored_version = await quorum_write(
+            key=key,
+            value=value,
+            candidates=candidates,
+            W=WRITE_QUORUM_W,
+            local_node_id=NODE_ID,
+            parent_vc=parent_vc
+        )
 
     return {
         "success": success,
@@ -204,7 +259,7 @@ async def put_handler(key: str, req: Request):
         "succeeded": succeeded,
         "failed": failed,
         "used_vc": stored_version.get("vc") if stored_version else None,
-        "stored_version": stored_version
+        "stored_version": public_versions([stored_version])[0] if stored_version else stored_version
     }
 
 
@@ -217,24 +272,21 @@ async def get_handler(key: str):
       - coordinator performs quorum read + optional read-repair
       - no vector clocks created or manipulated here
     """
-    await _maybe_sleep()
-
-    alive = (
-        membership_service.alive_nodes()
-        if callable(getattr(membership_service, "alive_nodes", None))
-        else membership_service.alive_nodes
-    )
-
-    candidates = global_ring.get_replicas(
-        key, N=REPLICATION_FACTOR, alive_nodes=alive
-    )
-
-    ok, resolved_versions, responders = await quorum_read(
-        key=key,
-        candidates=candidates,
-        R=READ_QUORUM_R,
-        do_read_repair=True
-    )
+    if _REQUEST_DELAY_MS > 0:
+        await asyncio.sleep(_REQUEST_DELAY_MS / 1000.0)
+
+    candidates = _alive_replicas(key)
+
+    if _local_only(candidates, READ_QUORUM_R):
+        # stored versions are already non-dominated and deduplicated
+        ok, resolved_versions, responders = True, get_local_versions_readonly(key), candidates
+    else:
+        ok, resolved_versions, responders = await quorum_read(
+            key=key,
+            candidates=candidates,
+            R=READ_QUORUM_R,
+            do_read_repair=True
+        )
 
     if not ok:
         raise HTTPException(
@@ -243,7 +295,7 @@ async def get_handler(key: str):
         )
 
     return {
-        "resolved_versions": resolved_versions,   # siblings as-is
+        "resolved_versions": public_versions(resolved_versions),   # siblings as-is
         "responded_nodes": responders
     }
 
@@ -254,19 +306,22 @@ async def get_handler(key: str):
 async def startup():
     # start membership/gossip background task
     asyncio.create_task(membership_service.run())
+    start_read_repair_workers()
     # (optional) print startup info
     print(f"[{NODE_ID}] node starting. Ring nodes: {global_ring.all_nodes()}")
 
 @app.on_event("shutdown")
 async def shutdown():
     membership_service.stop()
+    await close_rpc_client()
     await asyncio.sleep(0.1)
 
 # ---------- Gossip ----------
 @app.post("/gossip")
-async def gossip(remote_table: dict):
-    membership_service._merge(remote_table)
-    return membership_service.get_membership()
+async def gossip(req: Request):
+    # decoded/encoded with orjson, bypassing pydantic validation of the table
+    reply = membership_service.handle_gossip(orjson.loads(await req.body()))
+    return Response(orjson.dumps(reply), media_type="application/json")
 
 # ---- control endpoints: inject artificial delay per-request ----
 @app.post("/control/delay")
@@ -290,7 +345,7 @@ async def replicas_for_key(key: str):
     Return the actual replica set for this key according to this node’s ring view.
     """
     try:
-        replicas = global_ring.get_replicas(key, N=REPLICATION_FACTOR, alive_nodes=None)
+        replicas = _ring_replicas(key)
         return {"replicas": replicas}
     except Exception as e:
         return {"error": str(e)}
@@ -308,7 +363,7 @@ async def repair_once_endpoint(key: str):
     Returns summary about versions and whether push occurred.
     """
     # determine full replica list (use full N so we know peers)
-    candidates = global_ring.get_replicas(key, N=REPLICATION_FACTOR, alive_nodes=None)
+    candidates = _ring_replicas(key)
     if not candidates:
         return {"ok": False, "reason": "no candidates"}
 
@@ -319,47 +374,29 @@ async def repair_once_endpoint(key: str):
     except ValueError:
         target = candidates[0] if candidates else None
 
-    local_versions = get_local_versions(key)
+    local_versions = get_local_versions_readonly(key)
 
     # fetch remote versions from target
     remote_versions = []
     try:
-        async with httpx.AsyncClient(timeout=2.0) as client:
-            r = await client.get(f"http://{target}/get_local/{key}")
-            if r.status_code == 200:
-                remote_versions = r.json().get("versions", [])
+        r = await RPC_CLIENT.get(f"http://{target}/get_local/{key}", timeout=2.0)
+        if r.status_code == 200:
+            remote_versions = orjson.loads(r.content).get("versions", [])
     except Exception:
         # target unreachable
         return {"ok": False, "reason": "target_unreachable", "target": target}
 
     # compute merged set (non-dominated)
-    all_versions = local_versions + remote_versions
-    keep = []
-    for v in all_versions:
-        vvc = VectorClock.from_dict(v["vc"])
-        dominated = False
-        for w in all_versions:
-            if v is w:
-                continue
-            wvc = VectorClock.from_dict(w["vc"])
-            cmp = VectorClock.compare(vvc, wvc)
-            if cmp == -1:
-                dominated = True
-                break
-        if not dominated:
-            keep.append(v)
+    keep = drop_dominated([*local_versions, *remote_versions])
 
     # overwrite local versions with merged set
     overwrite_local_versions(key, keep)
 
-    # push merged versions to target (one hop)
+    # push merged versions to target (one hop, one RPC)
     pushed = 0
     try:
-        async with httpx.AsyncClient(timeout=2.0) as client:
-            for v in keep:
-                payload = {"key": key, "value": v["value"], "vc": v["vc"]}
-                await client.put(f"http://{target}/replicate", json=payload)
-                pushed += 1
+        await RPC_CLIENT.put(f"http://{target}/replicate_batch", content=batch_payload(key, keep), headers=JSON_HEADERS, timeout=2.0)
+        pushed = len(keep)
     except Exception:
         pass
 
@@ -367,6 +404,10 @@ async def repair_once_endpoint(key: str):
 
 # ---------- Main run helper ----------
 if __name__ == "__main__":
-    uvicorn.run("node:app", host="127.0.0.1", port=PORT, log_level="warning",
-        access_log=False
+    uvicorn.run("node:app", host=HOST, port=PORT, log_level="warning",
+        access_log=False,
+        loop="uvloop",  # the app, gossip and failure detector all run on this loop
+        http="httptools",
+        # one worker only: _STORE and membership state live in this process
+        workers=1,
     )
\ No newline at end of file
@@ -1,68 +1,104 @@
 # node/replication.py
 import asyncio
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional, Set
 import httpx
+import orjson
+import msgpack
 from vector_clock import VectorClock
-from storage import put_local, get_local_versions, merge_remote_versions, overwrite_local_versions
-import time
+from storage import put_local, get_local_versions_readonly, overwrite_local_versions, merge_versions, version_signature
 
 # timeouts
 _RPC_TIMEOUT = 2.0
 
+# one keep-alive pool for every replica RPC (closed by close_rpc_client on shutdown)
+RPC_CLIENT = httpx.AsyncClient(
+    timeout=_RPC_TIMEOUT,
+    limits=httpx.Limits(max_keepalive_connections=256, max_connections=512),
+)
+
+# request bodies are encoded with orjson rather than httpx's stdlib json
+JSON_HEADERS = {"content-type": "application/json"}
+
+async def close_rpc_client():
+    await RPC_CLIENT.aclose()
+
+# replica writes / repairs still running after the quorum call returned;
+# referenced here so they are not garbage-collected before finishing
+_BACKGROUND_TASKS: Set[asyncio.Task] = set()
+
+def _run_in_background(task: asyncio.Task):
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+def batch_payload(key: str, versions: List[Dict[str, Any]]) -> bytes:
+    """Encoded /replicate_batch body carrying every version of key in one RPC."""
+    return orjson.dumps({"key": key, "versions": [{"value": v["value"], "vc": v["vc"]} for v in versions]})
+
+# read-repair pushes (node, key, versions) go through one bounded queue drained
+# by a fixed pool of workers; when it is full, pushes are dropped and counted.
+# Created by start_read_repair_workers, on the loop the workers run on.
+READ_REPAIR_QUEUE_SIZE = 10_000
+READ_REPAIR_WORKERS = 8
+_READ_REPAIR_QUEUE: Optional[asyncio.Queue] = None
+read_repair_dropped = 0
+
+async def _read_repair_worker(queue: asyncio.Queue):
+    while True:
+        node_addr, key, versions = await queue.get()
+        try:
+            await RPC_CLIENT.put(f"http://{node_addr}/replicate_batch", content=batch_payload(key, versions), headers=JSON_HEADERS)
+        except Exception:
+            pass
+        finally:
+            queue.task_done()
+
+def start_read_repair_workers():
+    """Create the read-repair queue and start its worker pool on the running loop (call once, at startup)."""
+    global _READ_REPAIR_QUEUE
+    _READ_REPAIR_QUEUE = asyncio.Queue(maxsize=READ_REPAIR_QUEUE_SIZE)
+    for _ in range(READ_REPAIR_WORKERS):
+        _run_in_background(asyncio.create_task(_read_repair_worker(_READ_REPAIR_QUEUE)))
+
+def _enqueue_read_repair(node_addr: str, key: str, versions: List[Dict[str, Any]]):
+    global read_repair_dropped
+    if _READ_REPAIR_QUEUE is None:  # workers not started
+        read_repair_dropped += 1
+        return
+    try:
+        _READ_REPAIR_QUEUE.put_nowait((node_addr, key, versions))
+    except asyncio.QueueFull:
+        read_repair_dropped += 1
+
 async def _rpc_put(node: str, payload: Dict[str, Any]) -> Tuple[str, bool]:
     """
     Send replicate RPC to node. Returns (node, success).
     """
     try:
-        async with httpx.AsyncClient(timeout=_RPC_TIMEOUT) as client:
-            r = await client.put(f"http://{node}/replicate", json=payload)
-            return node, r.status_code == 200
+        r = await RPC_CLIENT.put(f"http://{node}/replicate", content=orjson.dumps(payload), headers=JSON_HEADERS)
+        return node, r.status_code == 200
     except Exception:
         return node, False
 
-async def _rpc_get_local(node: str, key: str) -> Tuple[str, List[Dict[str, Any]]]:
+async def _rpc_get_local(node: str, key: str) -> Tuple[str, Optional[List[Dict[str, Any]]]]:
     """
-    Fetch local versions from a replica (used by quorum_read).
-    Returns (node, versions_list) or (node, []) on error.
+    Fetch local versions from a replica (used by quorum_read), MessagePack-encoded.
+    Returns (node, versions_list) or (node, None) on error.
     """
     try:
-        async with httpx.AsyncClient(timeout=_RPC_TIMEOUT) as client:
-            r = await client.get(f"http://{node}/get_local/{key}")
-            if r.status_code == 200:
-                return node, r.json().get("versions", [])
+        r = await RPC_CLIENT.get(f"http://{node}/get_local_mp/{key}")
+        if r.status_code == 200:
+            return node, msgpack.unpackb(r.content, raw=False)
     except Exception:
         pass
-    return node, []
+    return node, None
 
 def _merge_version_lists(all_versions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Dominance-based merge of a flat list of version dicts.
     Returns the list of non-dominated unique versions.
     """
-    # reuse logic similar to storage.merge_remote_versions
-    keep = []
-    for v in all_versions:
-        v_vc = VectorClock.from_dict(v["vc"])
-        dominated = False
-        for w in all_versions:
-            if v is w:
-                continue
-            w_vc = VectorClock.from_dict(w["vc"])
-            if VectorClock.compare(v_vc, w_vc) == -1:
-                dominated = True
-                break
-        if not dominated:
-            keep.append(v)
-
-    # dedupe identical
-    uniq = []
-    seen = set()
-    for v in keep:
-        sig = (v["value"], tuple(sorted(v["vc"].items())))
-        if sig not in seen:
-            seen.add(sig)
-            uniq.append(v)
-    return uniq
+    # same rules as storage.merge_remote_versions
+    return merge_versions(all_versions)
 
 async def quorum_write(
     key: str,
@@ -90,24 +126,26 @@ async def quorum_write(
     payload = {"key": key, "value": value, "vc": vc.to_dict()}
 
     rpc_targets = [n for n in candidates if n != local_node_id]
-    tasks = [_rpc_put(node, payload) for node in rpc_targets]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    tasks = [asyncio.ensure_future(_rpc_put(node, payload)) for node in rpc_targets]
 
     succeeded = []
     failed = []
 
-    for node, res in zip(rpc_targets, results):
-        ok = False
-        if isinstance(res, tuple):
-            ok = res[1]
-        elif isinstance(res, Exception):
-            ok = False
-        else:
-            ok = bool(res)
-        if ok:
-            succeeded.append(node)
-        else:
-            failed.append(node)
+    # return as soon as W acks are in (the local write counts as one); replicas
+    # still in flight keep replicating in the background and are reported in
+    # neither list
+    if W > 1:
+        for fut in asyncio.as_completed(tasks):
+            node, ok = await fut  # _rpc_put never raises
+            if ok:
+                succeeded.append(node)
+            else:
+                failed.append(node)
+            if len(succeeded) + 1 >= W:
+                break
+    for task in tasks:
+        if not task.done():
+            _run_in_background(task)
 
     succeeded.append(local_node_id)
     success = len(succeeded) >= W
@@ -126,13 +164,31 @@ async def quorum_read(
     If do_read_repair=True, asynchronously push merged canonical versions to replicas that are stale.
     Returns (ok_enough_responses, merged_versions, responders_list)
     """
-    # Fire parallel local fetches
-    tasks = [_rpc_get_local(node, key) for node in candidates]
-    results = await asyncio.gather(*tasks)
+    # Fire parallel local fetches and stop waiting once R have answered
+    # successfully (or every fetch has finished)
+    tasks = [asyncio.ensure_future(_rpc_get_local(node, key)) for node in candidates]
+    results = []
+    failed = []
+    if R > 0:
+        for fut in asyncio.as_completed(tasks):
+            node, vers = await fut  # _rpc_get_local never raises
+            if vers is None:
+                failed.append(node)
+                continue
+            results.append((node, vers))
+            if len(results) >= R:
+                break
+    for task in tasks:
+        task.cancel()  # no-op for finished fetches
+
+    if len(results) < R:
+        # every fetch finished without R real answers: as before the early
+        # return, failed fetches count as empty answers
+        results.extend((node, []) for node in failed)
 
-    responders = [node for node, vers in results if vers is not None]
-    # Count successes (non-empty return counts as response; we allow empty lists)
-    success_count = sum(1 for node, vers in results if vers is not None)
+    responders = [node for node, vers in results]
+    # Count successes (an empty list is a valid answer)
+    success_count = len(results)
 
     ok = success_count >= R
     if not ok:
@@ -142,32 +198,23 @@ async def quorum_read(
     flat = []
     node_versions_map = {}
     for node, vers in results:
-        v = vers or []
-        node_versions_map[node] = v
-        flat.extend(v)
+        node_versions_map[node] = vers
+        flat.extend(vers)
 
     merged = _merge_version_lists(flat)
-    overwrite_local_versions(key, merged)
+    merged_sigs = set(version_signature(v) for v in merged)
+    # replicas already in sync (the common case): leave the local list alone
+    if merged_sigs != set(version_signature(v) for v in get_local_versions_readonly(key)):
+        overwrite_local_versions(key, merged)
 
     # Optionally perform async read-repair: push merged to replicas that lack some versions
     if do_read_repair and merged:
-        async def _repair_target(node_addr: str, merged_versions: List[Dict[str, Any]]):
-            # For each merged version push via replicate RPC
-            async with httpx.AsyncClient(timeout=_RPC_TIMEOUT) as client:
-                for ver in merged_versions:
-                    payload = {"key": key, "value": ver["value"], "vc": ver["vc"]}
-                    try:
-                        await client.put(f"http://{node_addr}/replicate", json=payload)
-                    except Exception:
-                        pass
-
-        # Launch repair tasks in background
+        # Queue repair pushes for the background workers
         for node, existing in node_versions_map.items():
             # check if node lacks any merged version signature
-            existing_sigs = set((v["value"], tuple(sorted(v["vc"].items()))) for v in (existing or []))
-            merged_sigs = set((v["value"], tuple(sorted(v["vc"].items()))) for v in merged)
+            existing_sigs = set(version_signature(v) for v in existing)
             if not merged_sigs.issubset(existing_sigs):
-                # kick off repair (don't await)
-                asyncio.create_task(_repair_target(node, merged))
+                # hand off to the read-repair workers (don't await)
+                _enqueue_read_repair(node, key, merged)
 
     return True, merged, responders
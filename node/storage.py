@@ -1,14 +1,48 @@
 # node/storage.py
+import itertools
 import time
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Sequence, Tuple
 from vector_clock import VectorClock
+from storage_fast import dominance_filter
 
 # Each stored version is a dict:
 # { "value": <str>, "vc": <Dict[str,int]>, "ts": <float> }
-_STORE: Dict[str, List[Dict[str, Any]]] = {}
+# plus internal fields, which public_versions() strips before versions leave
+# the node: a cached "_sig" (see version_signature) once it has been compared,
+# and "_seq", the order in which this node stored it (see _stamp).
+# A key's versions are held as a tuple, rebuilt on every write and never
+# modified in place, so readers can hold on to it without copying.
+_STORE: Dict[str, Tuple[Dict[str, Any], ...]] = {}
+# key -> the version this node stored last (largest "_seq"), kept in step
+# with _STORE by _set_versions
+_LATEST: Dict[str, Dict[str, Any]] = {}
+
+# "ts" stays wall-clock: it is reported to clients and compared across
+# replicas (reads merge versions stamped by different nodes). Local
+# "which write is newer" ordering uses this counter instead.
+_SEQ = itertools.count(1)
+
+def _stamp(v: Dict[str, Any]):
+    if "_seq" not in v:
+        v["_seq"] = next(_SEQ)
 
 def store(key, value):
     _STORE[key] = value
+    _LATEST.pop(key, None)
+
+def _set_versions(key: str, versions: Sequence[Dict[str, Any]]):
+    versions = tuple(versions)
+    _STORE[key] = versions
+    if versions:
+        for v in versions:
+            _stamp(v)
+        _LATEST[key] = max(versions, key=lambda v: v["_seq"])
+    else:
+        _LATEST.pop(key, None)
+
+def latest_local_version(key: str) -> Dict[str, Any]:
+    """The version of key this node stored most recently, or None."""
+    return _LATEST.get(key)
 
 def get_value(key):
     return _STORE.get(key, None)
@@ -16,12 +50,39 @@ def get_value(key):
 def now_ts() -> float:
     return time.time()
 
-def _signature(v: Dict[str, Any]) -> Tuple:
+def version_signature(v: Dict[str, Any]) -> Tuple:
     """
     Deterministic signature to dedupe identical versions.
+    Computed once per version dict and cached on it under "_sig".
     """
-    vc_items = tuple(sorted(v["vc"].items()))
-    return (v["value"], vc_items)
+    sig = v.get("_sig")
+    if sig is None:
+        sig = v["_sig"] = (v["value"], tuple(sorted(v["vc"].items())))
+    return sig
+
+_INTERNAL_FIELDS = ("_sig", "_seq")
+
+def public_versions(versions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copies of versions without internal fields, for API responses."""
+    return [{k: x for k, x in v.items() if k not in _INTERNAL_FIELDS} for v in versions]
+
+# dominance filter (frontier pass over the raw vc dicts); lives in
+# storage_fast so it can be compiled with mypyc
+drop_dominated = dominance_filter
+
+def merge_versions(all_versions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Drop dominated versions and deduplicate identical ones, keeping the
+    original order of the survivors.
+    """
+    unique = []
+    seen = set()
+    for v in drop_dominated(all_versions):
+        sig = version_signature(v)
+        if sig not in seen:
+            seen.add(sig)
+            unique.append(v)
+    return unique
 
 def put_local(key: str, value: str, vc: VectorClock) -> Dict[str, Any]:
     """
@@ -29,7 +90,7 @@ def put_local(key: str, value: str, vc: VectorClock) -> Dict[str, Any]:
     drop dominated versions and deduplicate identical ones.
     Returns the stored version dict (the canonical record appended/kept).
     """
-    versions = _STORE.setdefault(key, [])
+    versions = _STORE.get(key, ())
     candidate = {
         "value": value,
         "vc": vc.to_dict(),
@@ -37,80 +98,41 @@ def put_local(key: str, value: str, vc: VectorClock) -> Dict[str, Any]:
     }
 
     # Combine candidate with existing, then run dominance/dedupe
-    all_versions = versions + [candidate]
-
-    keep: List[Dict[str, Any]] = []
-    for v in all_versions:
-        v_vc = VectorClock.from_dict(v["vc"])
-        dominated = False
-        for w in all_versions:
-            if v is w:
-                continue
-            w_vc = VectorClock.from_dict(w["vc"])
-            if VectorClock.compare(v_vc, w_vc) == -1:  # v < w
-                dominated = True
-                break
-        if not dominated:
-            keep.append(v)
-
-    # Deduplicate exact identical (value + vc)
-    unique = []
-    seen = set()
-    for v in keep:
-        sig = _signature(v)
-        if sig not in seen:
-            seen.add(sig)
-            unique.append(v)
+    unique = merge_versions([*versions, candidate])
 
-    _STORE[key] = unique
+    _set_versions(key, unique)
     # Return the canonical stored version corresponding to candidate's signature
-    cand_sig = (candidate["value"], tuple(sorted(candidate["vc"].items())))
+    cand_sig = version_signature(candidate)
     for v in unique:
-        if (v["value"], tuple(sorted(v["vc"].items()))) == cand_sig:
+        if version_signature(v) == cand_sig:
             return v
     # If candidate was dominated, return whichever entry dominates (best effort)
     return unique[-1] if unique else candidate
 
-def get_local_versions(key: str) -> List[Dict[str, Any]]:
+def get_local_versions_readonly(key: str) -> Tuple[Dict[str, Any], ...]:
     """
-    Return list of versions for a key (may be empty).
+    Return the stored tuple of versions for a key (may be empty), without copying.
     Each version is a dict with keys: value, vc(dict), ts.
+    Callers must not modify the version dicts.
     """
-    return _STORE.get(key, []).copy()
+    return _STORE.get(key, ())
 
-def overwrite_local_versions(key: str, versions: List[Dict[str, Any]]):
+def get_local_versions_snapshot(key: str) -> List[Dict[str, Any]]:
+    """
+    Return the versions for a key as a new list, for callers that modify it.
+    """
+    return list(_STORE.get(key, ()))
+
+def overwrite_local_versions(key: str, versions: Sequence[Dict[str, Any]]):
     """
     Replace versions list for a key (useful for repair).
     """
-    _STORE[key] = versions.copy()
+    _set_versions(key, versions)
 
 def merge_remote_versions(key: str, remote_versions: List[Dict[str, Any]]):
     """
     Merge remote versions into local store, keeping all non-dominated versions.
     """
-    all_versions = get_local_versions(key) + remote_versions
-    keep = []
-    for v in all_versions:
-        v_vc = VectorClock.from_dict(v["vc"])
-        dominated = False
-        for w in all_versions:
-            if v is w:
-                continue
-            w_vc = VectorClock.from_dict(w["vc"])
-            if VectorClock.compare(v_vc, w_vc) == -1:
-                dominated = True
-                break
-        if not dominated:
-            keep.append(v)
-
-    # dedupe identical
-    unique = []
-    seen = set()
-    for v in keep:
-        sig = (v["value"], tuple(sorted(v["vc"].items())))
-        if sig not in seen:
-            seen.add(sig)
-            unique.append(v)
-
+    unique = merge_versions([*get_local_versions_readonly(key), *remote_versions])
     overwrite_local_versions(key, unique)
     return unique
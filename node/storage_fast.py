@@ -0,0 +1,71 @@
+# node/storage_fast.py
+"""
+Vector-clock comparison and dominance filtering on raw version dicts.
+
+Kept dependency-free and fully annotated so it can be compiled with mypyc
+(`mypyc node/storage_fast.py`, run from the repo root); a compiled extension
+next to this file is picked up by the normal `import storage_fast`, and the
+plain module is used otherwise.
+"""
+from typing import Any, Dict, List
+
+
+def vc_cmp(a: Dict[str, int], b: Dict[str, int]) -> int:
+    """
+    Compare two {node: counter} dicts (missing counters are 0).
+    Return -1 if a < b, 0 if equal, 1 if a > b, 2 if concurrent.
+    One pass over a, then over the keys only b has.
+    """
+    a_less = False
+    b_less = False
+    for k, av in a.items():
+        bv = b.get(k, 0)
+        if av < bv:
+            a_less = True
+        elif av > bv:
+            b_less = True
+    for k, bv in b.items():
+        if k not in a:
+            if bv > 0:
+                a_less = True
+            elif bv < 0:
+                b_less = True
+    if a_less and not b_less:
+        return -1
+    if b_less and not a_less:
+        return 1
+    if not a_less and not b_less:
+        return 0
+    return 2  # concurrent
+
+
+def _neg_sum(vc: Dict[str, int]) -> int:
+    total = 0
+    for c in vc.values():
+        total += c
+    return -total
+
+
+def dominance_filter(versions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Versions whose "vc" is not dominated by any other, in their original order.
+
+    A version can only be dominated by one with a larger counter sum, so
+    versions are visited by descending sum and each is compared only against
+    the non-dominated frontier found so far (dominance is transitive).
+    """
+    n = len(versions)
+    vcs: List[Dict[str, int]] = [v["vc"] for v in versions]
+    sums: List[int] = [_neg_sum(vc) for vc in vcs]
+    order: List[int] = sorted(range(n), key=sums.__getitem__)
+    frontier: List[Dict[str, int]] = []
+    dominated: List[bool] = [False] * n
+    for i in order:
+        vc = vcs[i]
+        for w_vc in frontier:
+            if vc_cmp(vc, w_vc) == -1:  # v < w
+                dominated[i] = True
+                break
+        if not dominated[i]:
+            frontier.append(vc)
+    return [versions[i] for i in range(n) if not dominated[i]]
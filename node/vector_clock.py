@@ -1,12 +1,30 @@
 # node/vector_clock.py
-from typing import Dict, Tuple, Any
+import bisect
+from typing import Dict, List, Tuple, Any
 import json
 
+from storage_fast import vc_cmp
+
+
+# node ids are interned to small ints on first sight; clocks store
+# (index, counter) pairs sorted by index and convert back to
+# {node_id: counter} dicts only in to_dict()/serialize()
+NODE_INDEX: Dict[str, int] = {}
+_NODE_NAMES: List[str] = []
+
+
+def _intern(node_id: str) -> int:
+    idx = NODE_INDEX.get(node_id)
+    if idx is None:
+        idx = NODE_INDEX[node_id] = len(_NODE_NAMES)
+        _NODE_NAMES.append(node_id)
+    return idx
+
 
 class VectorClock:
     """
     Simple vector clock implementation.
-    - Represented as a dict node_id -> counter (int).
+    - Represented as a sorted list of (node index, counter) pairs, see NODE_INDEX.
     - compare(a,b) returns:
         -1 if a < b (a happened-before b)
          0 if a == b
@@ -15,28 +33,37 @@ class VectorClock:
     """
 
     def __init__(self, clock: Dict[str, int] = None):
-        self.clock = dict(clock) if clock else {}
+        self.clock: List[Tuple[int, int]] = sorted((_intern(k), v) for k, v in clock.items()) if clock else []
 
     def increment(self, node_id: str):
-        self.clock[node_id] = self.clock.get(node_id, 0) + 1
+        idx = _intern(node_id)
+        i = bisect.bisect_left(self.clock, (idx,))
+        if i < len(self.clock) and self.clock[i][0] == idx:
+            self.clock[i] = (idx, self.clock[i][1] + 1)
+        else:
+            self.clock.insert(i, (idx, 1))
 
     def update(self, other: "VectorClock"):
         """Merge other's counters (take max)."""
-        for k, v in other.clock.items():
-            self.clock[k] = max(self.clock.get(k, 0), v)
+        merged = dict(self.clock)
+        for k, v in other.clock:
+            merged[k] = max(merged.get(k, 0), v)
+        self.clock = sorted(merged.items())
 
     def copy(self) -> "VectorClock":
-        return VectorClock(dict(self.clock))
+        vc = VectorClock()
+        vc.clock = list(self.clock)
+        return vc
 
     def to_dict(self) -> Dict[str, int]:
-        return dict(self.clock)
+        return {_NODE_NAMES[i]: c for i, c in self.clock}
 
     @staticmethod
     def from_dict(d: Dict[str, int]) -> "VectorClock":
-        return VectorClock(dict(d or {}))
+        return VectorClock(d)
 
     def serialize(self) -> str:
-        return json.dumps(self.clock, sort_keys=True)
+        return json.dumps(self.to_dict(), sort_keys=True)
 
     @staticmethod
     def deserialize(s: str) -> "VectorClock":
@@ -52,16 +79,36 @@ class VectorClock:
           1 if a > b
           2 if concurrent
         """
-        keys = set(a.clock.keys()) | set(b.clock.keys())
+        # two-pointer merge over the index-sorted pairs (missing counters are 0)
+        ac, bc = a.clock, b.clock
+        i = j = 0
         a_less = False
         b_less = False
-        for k in keys:
-            av = a.clock.get(k, 0)
-            bv = b.clock.get(k, 0)
+        while i < len(ac) and j < len(bc):
+            (ak, av), (bk, bv) = ac[i], bc[j]
+            if ak == bk:
+                i += 1
+                j += 1
+            elif ak < bk:
+                bv = 0
+                i += 1
+            else:
+                av = 0
+                j += 1
             if av < bv:
                 a_less = True
             elif av > bv:
                 b_less = True
+        for _, av in ac[i:]:
+            if av > 0:
+                b_less = True
+            elif av < 0:
+                a_less = True
+        for _, bv in bc[j:]:
+            if bv > 0:
+                a_less = True
+            elif bv < 0:
+                b_less = True
         if a_less and not b_less:
             return -1
         if b_less and not a_less:
@@ -70,6 +117,9 @@ class VectorClock:
             return 0
         return 2  # concurrent
 
+    # compare() on raw {node: counter} dicts, without wrapping them
+    compare_dicts = staticmethod(vc_cmp)
+
     def __repr__(self) -> str:
-        return f"VC({self.clock})"
+        return f"VC({self.to_dict()})"
 
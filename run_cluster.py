@@ -1,10 +1,13 @@
 # run_cluster.py
 import subprocess
+import sys
 import time
 import argparse
 import json
 import os
 
+NODE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "node", "node.py")
+
 def launch_cluster(
     n_nodes,
     base_port=60000,
@@ -24,7 +27,7 @@ def launch_cluster(
     for i, port in enumerate(ports):
         node_id = f"node{i}"
         cmd = [
-            "python", "node/node.py",
+            sys.executable, NODE_SCRIPT,
             "--node_id", node_id,
             "--port", str(port),
             "--all_nodes", all_nodes_str,
@@ -60,11 +63,14 @@ if __name__ == "__main__":
     parser.add_argument("--read_quorum_r", type=int, default=2)
     parser.add_argument("--write_quorum_w", type=int, default=2)
     parser.add_argument("--output_dir", type=str, default=None)
+    parser.add_argument("--stagger", type=float, default=0.15,
+                        help="Seconds between node launches (0 starts them all at once)")
     args = parser.parse_args()
 
     procs, cluster_procs_path = launch_cluster(
         args.nodes,
         base_port=args.base_port,
+        stagger=args.stagger,
         replication_factor=args.replication_factor,
         read_quorum_r=args.read_quorum_r,
         write_quorum_w=args.write_quorum_w,
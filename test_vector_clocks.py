@@ -1,9 +1,11 @@
 # test_concurrent_vc.py
 import asyncio
-import httpx
+import aiohttp
 import json
+import orjson
 import random
-from pprint import pprint
+import uvloop
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 NODES = [
     "127.0.0.1:60001",
@@ -11,64 +13,102 @@ NODES = [
     "127.0.0.1:60004",
 ]
 
-async def put(node, key, value):
-    async with httpx.AsyncClient() as client:
-        try:
-            r = await client.put(f"http://{node}/put/{key}", json={"value": value}, timeout=5.0)
-            return r.json()
-        except Exception as e:
-            return {"error": str(e)}
-
-async def get(node, key):
-    async with httpx.AsyncClient() as client:
-        try:
-            r = await client.get(f"http://{node}/get/{key}", timeout=5.0)
-            return r.json()
-        except Exception as e:
-            return {"error": str(e)}
+# transient connection failures are retried with backoff; anything else
+# (or a connection that keeps failing) is reported as {"error": ...}
+def _retry_on(exc_type):
+    return retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=0.1, max=1.0),
+        retry=retry_if_exception_type(exc_type),
+        reraise=True,
+    )
+
+_retry_transient = _retry_on(aiohttp.ClientConnectionError)
+# PUTs are retried only when the connection was never made: a disconnect after
+# sending may come after the node stored the value, and a retry would then add
+# an extra sibling to the versions this test counts
+_retry_unsent = _retry_on(aiohttp.ClientConnectorError)
+
+@_retry_unsent
+async def _put(session, node, key, value):
+    async with session.put(f"http://{node}/put/{key}", json={"value": value}) as r:
+        return orjson.loads(await r.read())
+
+@_retry_transient
+async def _get(session, node, key):
+    async with session.get(f"http://{node}/get/{key}") as r:
+        return orjson.loads(await r.read())
+
+def show(obj):
+    # orjson's C serializer instead of pprint's recursive formatter; keys sorted like pprint
+    print(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS).decode())
+
+async def put(session, node, key, value):
+    try:
+        return await _put(session, node, key, value)
+    except Exception as e:
+        return {"error": str(e)}
+
+async def get(session, node, key):
+    try:
+        return await _get(session, node, key)
+    except Exception as e:
+        return {"error": str(e)}
 
 async def main():
+    # one pooled session for the whole run, so requests reuse keep-alive sockets
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=30, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=5.0)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        await run(session)
+
+async def run(session):
     key = "concurrent-key-" + str(random.randint(1,1000000))
     nodeA = NODES[0]
     nodeB = NODES[1]
     print("Issuing two concurrent PUTs to", nodeA, "and", nodeB)
 
     # fire two puts concurrently (no await between them)
-    t1 = asyncio.create_task(put(nodeA, key, "A_CONCURRENT"))
-    t2 = asyncio.create_task(put(nodeB, key, "B_CONCURRENT"))
+    t1 = asyncio.create_task(put(session, nodeA, key, "A_CONCURRENT"))
+    t2 = asyncio.create_task(put(session, nodeB, key, "B_CONCURRENT"))
 
     resp1, resp2 = await asyncio.gather(t1, t2)
     print("\nPUT responses:")
     print("resp1:")
-    pprint(resp1)
+    show(resp1)
     print("resp2:")
-    pprint(resp2)
+    show(resp2)
 
     used_vc1 = resp1.get("used_vc")
     used_vc2 = resp2.get("used_vc")
     print("\nused_vc1:", used_vc1)
     print("used_vc2:", used_vc2)
 
-    # Now do a GET from a third node to observe siblings
-    print("\nDoing a quorum GET from node", NODES[2])
-    gresp = await get(NODES[2], key)
-    pprint(gresp)
+    # Now GET from every node at once to observe siblings; the third node
+    # (which took neither PUT) is the view reported below
+    print("\nDoing quorum GETs from all nodes; reporting", NODES[2])
+    gets = await asyncio.gather(*(get(session, n, key) for n in NODES))
+    for n, g in zip(NODES, gets):
+        print(n, "sees", len(g.get("resolved_versions", [])), "version(s)")
+    gresp = gets[2]
+    show(gresp)
 
     resolved = gresp.get("resolved_versions", [])
     print(f"\nNumber of resolved versions: {len(resolved)}")
     for v in resolved:
-        print("value:", v.get("value"), "vc:", v.get("vc"))
+        value, vc = v["value"], v["vc"]
+        print("value:", value, "vc:", vc)
 
     # If two siblings present, demonstrate a FINAL write that merges them:
     if len(resolved) > 1:
         print("\nWriting FINAL to merge siblings (coordinator will sample parents).")
         # Do a normal PUT; coordinator will sample parents and create merged VC.
-        fresp = await put(NODES[2], key, "FINAL_MERGE")
+        fresp = await put(session, NODES[2], key, "FINAL_MERGE")
         print("FINAL PUT resp:")
-        pprint(fresp)
+        show(fresp)
         print("\nGET after FINAL:")
-        g2 = await get(NODES[2], key)
-        pprint(g2)
+        g2 = await get(session, NODES[2], key)
+        show(g2)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    uvloop.run(main())
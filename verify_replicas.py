@@ -1,17 +1,48 @@
 import asyncio
-import httpx
+import aiohttp
+import bisect
+import functools
 import hashlib
 import json
+import orjson
+import uvloop
 
-async def get_server_replicas(node, key):
-    async with httpx.AsyncClient(timeout=3.0) as client:
-        r = await client.get(f"http://{node}/replicas_for_key/{key}")
-        return r.json().get("replicas", [])
+VNODES_PER_NODE = 40
 
-def approx_replicas_from_ring(key, nodes, N):
-    h = int(hashlib.sha1(key.encode()).hexdigest(), 16)
-    idx = h % len(nodes)
-    return [nodes[(idx + i) % len(nodes)] for i in range(N)]
+async def get_server_replicas(session, node, key):
+    async with session.get(f"http://{node}/replicas_for_key/{key}") as r:
+        return orjson.loads(await r.read()).get("replicas", [])
+
+def _hash64(s):
+    return int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+
+@functools.lru_cache(maxsize=None)
+def _ring_for(nodes):
+    """(sorted vnode positions, owning node per position) for a tuple of nodes."""
+    vnodes = sorted((_hash64(f"{n}#{i}"), n) for n in nodes for i in range(VNODES_PER_NODE))
+    return [pos for pos, _ in vnodes], [n for _, n in vnodes]
+
+@functools.lru_cache(maxsize=4096)
+def approx_replicas_from_ring(key, nodes, node_count, N):
+    """
+    Estimated replicas of key as a tuple. nodes must be a tuple (cache key) of
+    node_count distinct nodes, both computed once by the caller.
+    """
+    positions, owners = _ring_for(nodes)
+    N = min(N, node_count)
+    if N <= 0:
+        return ()
+    ring_size = len(owners)
+    start = bisect.bisect(positions, _hash64(key))
+    # walk clockwise from the key's position, collecting N distinct nodes
+    replicas = []
+    for i in range(ring_size):
+        n = owners[(start + i) % ring_size]
+        if n not in replicas:
+            replicas.append(n)
+            if len(replicas) == N:
+                break
+    return tuple(replicas)
 
 async def main():
     with open("cluster_procs.json") as f:
@@ -23,13 +54,30 @@ async def main():
     coordinator = all_nodes[0]
     N = 3
 
-    for key in sample_keys:
-        server_reps = await get_server_replicas(coordinator, key)
-        approx_reps = approx_replicas_from_ring(key, all_nodes, N)
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=30, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=3.0)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        await check_keys(session, coordinator, sample_keys, all_nodes, N)
+
+async def check_keys(session, coordinator, sample_keys, all_nodes, N):
+    # loop invariants for the client-side estimate
+    nodes_tuple = tuple(all_nodes)
+    node_count = len(nodes_tuple)
+
+    # all lookups in flight at once; results come back in sample_keys order
+    tasks = [get_server_replicas(session, coordinator, k) for k in sample_keys]
+    lookups = asyncio.gather(*tasks)
+    # hash and place the keys on a worker thread while the lookups are in flight
+    loop = asyncio.get_running_loop()
+    estimates = await loop.run_in_executor(
+        None, lambda: [list(approx_replicas_from_ring(k, nodes_tuple, node_count, N)) for k in sample_keys])
+    results = await lookups
+
+    for key, server_reps, approx_reps in zip(sample_keys, results, estimates):
         print("\nKEY:", key)
         print("SERVER:", server_reps)
         print("APPROX:", approx_reps)
         mismatch = server_reps != approx_reps
         print("MISMATCH:", mismatch)
 
-asyncio.run(main())
+uvloop.run(main())
@@ -4,428 +4,451 @@ Visualization script for Dynamo experiment results.
 Aggregates results from all experiment suites and generates plots.
 """
 
-import json
 import os
 import glob
 import argparse
+import hashlib
+import io
+import multiprocessing
+import tempfile
+from contextlib import redirect_stdout
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import matplotlib
+matplotlib.use("Agg")  # files only, no GUI backend; set before pyplot is imported
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
+import orjson
 import pandas as pd
 from typing import Dict, List, Any, Optional
 
-def load_experiment_data(results_dir: str = "results") -> List[Dict[str, Any]]:
+def _load_one(metrics_file: Path) -> Optional[Dict[str, Any]]:
+    """Load one experiment directory's metrics (and config, if present); None if the metrics can't be read."""
+    exp_dir = metrics_file.parent
+    
+    # Load metrics
+    try:
+        metrics = orjson.loads(metrics_file.read_bytes())
+    except Exception as e:
+        print(f"Warning: Could not load {metrics_file}: {e}")
+        return None
+    
+    # Load config
+    config_file = exp_dir / "experiment_config.json"
+    config = {}
+    if config_file.exists():
+        try:
+            config = orjson.loads(config_file.read_bytes())
+        except Exception:
+            pass
+    
+    # Extract experiment name from directory
+    exp_name = exp_dir.name
+    suite_name = exp_dir.parent.name
+    
+    # Combine into single record; nested metrics are flattened by load_experiment_data
+    return {
+        "suite": suite_name,
+        "experiment": exp_name,
+        "path": str(exp_dir),
+        **config,
+        **metrics
+    }
+
+def load_experiment_data(results_dir: str = "results") -> pd.DataFrame:
     """
     Load all experiment results from the results directory.
-    Returns a list of dictionaries containing both config and metrics.
+    Returns one row per experiment (config and metrics) in load order, nested
+    metrics flattened into "_"-joined columns (availability_overall,
+    availability_by_window_failure_overall, consistency_ryw_violations, ...).
     """
-    experiments = []
     results_path = Path(results_dir)
     
-    # Find all computed_metrics.json files
-    for metrics_file in results_path.rglob("computed_metrics.json"):
-        exp_dir = metrics_file.parent
-        
-        # Load metrics
+    # Find all computed_metrics.json files, then read them on a thread pool
+    # (file IO releases the GIL); map keeps the directory-walk order
+    paths = list(results_path.rglob("computed_metrics.json"))
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        experiments = [exp for exp in executor.map(_load_one, paths) if exp is not None]
+    
+    return pd.json_normalize(experiments, sep="_")
+
+# Columns the plots read; ensured to exist (as NaN) even if no experiment has them
+FRAME_COLUMNS = [
+    "suite", "experiment", "nodes", "replication_factor", "read_quorum_r", "write_quorum_w",
+    "failure_mode", "crash_count", "concurrency",
+    "availability_overall", "availability_reads", "availability_writes",
+    "availability_by_window_warmup_overall", "availability_by_window_failure_overall",
+    "consistency_ryw_violations", "consistency_monotonic_read_violations",
+    "consistency_stale_read_rate", "consistency_multi_version_reads",
+]
+INT_COLUMNS = ["nodes", "replication_factor", "read_quorum_r", "write_quorum_w", "crash_count", "concurrency"]
+CATEGORY_COLUMNS = ["suite", "experiment", "failure_mode"]
+
+def build_experiment_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The loaded experiments (see load_experiment_data) with every FRAME_COLUMNS
+    column present and the settings given their typed dtypes.
+    """
+    for col in FRAME_COLUMNS:
+        if col not in df:
+            df[col] = np.nan
+    # nullable ints, so a missing setting doesn't turn "rf3" into "rf3.0" in titles and filenames
+    for col in INT_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int32")
+    # few distinct values each: categorical columns are smaller and group faster
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df
+
+# Bump whenever build_experiment_frame's output changes, so old caches aren't reused
+FRAME_CACHE_VERSION = 3
+
+def _results_fingerprint(results_path: Path) -> str:
+    """Hash of every results file's path and mtime; changes whenever one is added, removed or rewritten."""
+    files = [*results_path.rglob("computed_metrics.json"), *results_path.rglob("experiment_config.json")]
+    stamps = sorted(f"{p}{p.stat().st_mtime_ns}".encode() for p in files)
+    return hashlib.md5(b"".join([str(FRAME_CACHE_VERSION).encode(), *stamps])).hexdigest()
+
+def load_experiment_frame(results_dir: str = "results", cache_dir: str = "plots") -> pd.DataFrame:
+    """
+    The experiment frame (see build_experiment_frame) for results_dir. It is cached
+    as Parquet in cache_dir, keyed by _results_fingerprint, so re-runs skip
+    walking and parsing the JSON until the results change.
+    """
+    results_path = Path(results_dir)
+    cache_file = Path(cache_dir) / f".cache_{_results_fingerprint(results_path)}.parquet"
+    if cache_file.exists():
         try:
-            with open(metrics_file) as f:
-                metrics = json.load(f)
+            return pd.read_parquet(cache_file)
         except Exception as e:
-            print(f"Warning: Could not load {metrics_file}: {e}")
-            continue
-        
-        # Load config
-        config_file = exp_dir / "experiment_config.json"
-        config = {}
-        if config_file.exists():
-            try:
-                with open(config_file) as f:
-                    config = json.load(f)
-            except Exception:
-                pass
-        
-        # Extract experiment name from directory
-        exp_name = exp_dir.name
-        suite_name = exp_dir.parent.name
+            print(f"Warning: Could not read cache {cache_file}: {e}")
+    
+    df = build_experiment_frame(load_experiment_data(results_dir))
+    if not df.empty:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            for stale in Path(cache_dir).glob(".cache_*.parquet"):
+                stale.unlink()
+            df.to_parquet(cache_file, index=False)
+        except Exception as e:
+            print(f"Warning: Could not write cache {cache_file}: {e}")
+    return df
+
+# PNG resolution; pass --dpi 300 for publication-quality figures
+DEFAULT_DPI = 120
+
+# Each process keeps one figure and clears it between renders (see _figure)
+_FIGURE = None
+
+def _figure(figsize) -> plt.Figure:
+    """
+    A blank figure of the given size: this process's figure, cleared, when it
+    already has that size (much cheaper than closing it and creating a new one),
+    otherwise a new one.
+    """
+    global _FIGURE
+    if _FIGURE is not None:
+        if tuple(_FIGURE.get_size_inches()) == tuple(figsize):
+            _FIGURE.clear()
+            return _FIGURE
+        plt.close(_FIGURE)
+    _FIGURE = plt.figure(figsize=figsize)
+    return _FIGURE
+
+def _render_all(render, tasks: List[tuple]):
+    """
+    Call render(*args) for every args tuple in tasks; each call draws and saves
+    one figure and returns its path. Figures are independent, so they are spread
+    over a process pool; paths are printed in task order once all are saved.
+    Inside a phase worker (see _run_phases) they are rendered in-process, as
+    pool workers can't start pools of their own.
+    """
+    processes = min(len(tasks), os.cpu_count() or 1)
+    if multiprocessing.current_process().daemon:
+        processes = 1
+    if processes > 1:
+        with multiprocessing.Pool(processes=processes) as pool:
+            filenames = pool.starmap(render, tasks)
+    else:
+        filenames = [render(*args) for args in tasks]
+    for filename in filenames:
+        print(f"Saved: {filename}")
+
+def _render_crash_count(conc_df: pd.DataFrame, num_plots: int, rf, concurrency, dpi: int,
+                        filename: str) -> str:
+    cols = min(3, num_plots)
+    rows = (num_plots + cols - 1) // cols
+    fig = _figure((5*cols, 4*rows))
+    # Axes only for the slots that get a plot; the rest of the grid stays empty
+    gs = fig.add_gridspec(rows, cols)
+    
+    plot_idx = 0
+    for (nodes, r, w), subset in conc_df.groupby(["nodes", "read_quorum_r", "write_quorum_w"]):
+        ax = fig.add_subplot(gs[plot_idx // cols, plot_idx % cols])
+        subset = subset.drop_duplicates("crash_count")
+        crash_counts = subset["crash_count"].values
         
-        # Combine into single record
-        exp_data = {
-            "suite": suite_name,
-            "experiment": exp_name,
-            "path": str(exp_dir),
-            **config,
-            **metrics
-        }
-        experiments.append(exp_data)
-    
-    return experiments
-
-def plot_availability_vs_crash_count(experiments: List[Dict], output_dir: str = "plots"):
+        ax.plot(crash_counts, subset["availability_overall"].values, 'o-', label='Overall', linewidth=2, markersize=8)
+        ax.plot(crash_counts, subset["availability_reads"].values, 's-', label='Reads', linewidth=2, markersize=8)
+        ax.plot(crash_counts, subset["availability_writes"].values, '^-', label='Writes', linewidth=2, markersize=8)
+        ax.set_xlabel('Crash Count', fontsize=10)
+        ax.set_ylabel('Availability', fontsize=10)
+        ax.set_title(f'N={nodes}, R={r}, W={w}', fontsize=11, fontweight='bold')
+        ax.set_ylim([0, 1.05])
+        ax.grid(True, alpha=0.3)
+        if plot_idx == 0:
+            ax.legend(fontsize=8)
+        plot_idx += 1
+    
+    fig.suptitle(f'Availability vs Crash Count (RF={rf}, Concurrency={concurrency})',
+                fontsize=14, fontweight='bold', y=1.0)
+    fig.tight_layout()
+    fig.savefig(filename, dpi=dpi, bbox_inches='tight')
+    return filename
+
+def plot_availability_vs_crash_count(df: pd.DataFrame, output_dir: str = "plots", dpi: int = DEFAULT_DPI):
     """Plot availability vs crash count for different configurations, separated by RF and concurrency."""
-    os.makedirs(output_dir, exist_ok=True)
-    
     # Filter experiments with crash_count
-    crash_experiments = [e for e in experiments if e.get("crash_count") is not None and e.get("failure_mode") == "crash"]
+    crash_df = df[df["crash_count"].notna() & (df["failure_mode"] == "crash")]
     
-    if not crash_experiments:
+    if crash_df.empty:
         print("No crash count experiments found")
         return
     
-    # Group by replication_factor first, then by nodes, read_quorum_r, write_quorum_w, concurrency
-    rf_values = sorted(set(e.get("replication_factor", 0) for e in crash_experiments))
-    
-    for rf in rf_values:
-        rf_experiments = [e for e in crash_experiments if e.get("replication_factor") == rf]
-        if not rf_experiments:
+    # Missing availability counts as 0; stable sort: among experiments with the
+    # same crash count the first loaded one is plotted
+    crash_df = crash_df.fillna({"availability_overall": 0, "availability_reads": 0, "availability_writes": 0})
+    crash_df = crash_df.sort_values("crash_count", kind="stable")
+    
+    # One figure per (replication_factor, concurrency), one subplot per (nodes, r, w)
+    tasks = []
+    for (rf, concurrency), conc_df in crash_df.groupby(["replication_factor", "concurrency"]):
+        num_plots = (conc_df["nodes"].nunique() * conc_df["read_quorum_r"].nunique()
+                     * conc_df["write_quorum_w"].nunique())
+        if num_plots == 0:
+            continue
+        filename = f"{output_dir}/availability_vs_crash_count_rf{rf}_c{concurrency}.png"
+        tasks.append((conc_df, num_plots, rf, concurrency, dpi, filename))
+    _render_all(_render_crash_count, tasks)
+
+def _render_quorum_heatmap(subset: pd.DataFrame, failure_modes: List[str], rf, concurrency, nodes,
+                           dpi: int, filename: str) -> str:
+    fig = _figure((6*len(failure_modes), 5))
+    axes = fig.subplots(1, len(failure_modes))
+    if len(failure_modes) == 1:
+        axes = [axes]
+    
+    for idx, failure_mode in enumerate(failure_modes):
+        ax = axes[idx]
+        mode_df = subset[subset["failure_mode"] == failure_mode]
+        
+        if mode_df.empty:
+            ax.set_visible(False)
             continue
         
-        # Get unique concurrency values
-        concurrency_values = sorted(set(e.get("concurrency", 10) for e in rf_experiments))
+        # Create heatmap data: one cell per (R, W), taken from the first
+        # experiment loaded for it; cells with no experiment stay 0
+        piv = mode_df.fillna({"availability_overall": 0}).pivot_table(
+            index="read_quorum_r", columns="write_quorum_w",
+            values="availability_overall", aggfunc="first", fill_value=0)
+        r_values = piv.index
+        w_values = piv.columns
+        heatmap_data = piv.values
         
-        for concurrency in concurrency_values:
-            conc_experiments = [e for e in rf_experiments if e.get("concurrency", 10) == concurrency]
-            if not conc_experiments:
-                continue
-            
-            # Group by nodes, read_quorum_r, write_quorum_w
-            nodes_list = sorted(set(e.get("nodes", 0) for e in conc_experiments))
-            r_values = sorted(set(e.get("read_quorum_r", 0) for e in conc_experiments))
-            w_values = sorted(set(e.get("write_quorum_w", 0) for e in conc_experiments))
-            
-            # Create subplots for each (nodes, r, w) combination
-            num_plots = len(nodes_list) * len(r_values) * len(w_values)
-            if num_plots == 0:
-                continue
-            
-            cols = min(3, num_plots)
-            rows = (num_plots + cols - 1) // cols
-            fig, axes = plt.subplots(rows, cols, figsize=(5*cols, 4*rows))
-            if num_plots == 1:
-                axes = [axes]
-            else:
-                axes = axes.flatten()
-            
-            plot_idx = 0
-            for nodes in nodes_list:
-                for r in r_values:
-                    for w in w_values:
-                        subset = [e for e in conc_experiments 
-                                 if e.get("nodes") == nodes and 
-                                 e.get("read_quorum_r") == r and 
-                                 e.get("write_quorum_w") == w]
-                        
-                        if not subset or plot_idx >= len(axes):
-                            continue
-                        
-                        ax = axes[plot_idx]
-                        crash_counts = sorted(set(e.get("crash_count", 0) for e in subset))
-                        overall_avail = []
-                        read_avail = []
-                        write_avail = []
-                        
-                        for cc in crash_counts:
-                            exp = next((e for e in subset if e.get("crash_count") == cc), None)
-                            if exp and "availability" in exp:
-                                overall_avail.append(exp["availability"].get("overall", 0))
-                                read_avail.append(exp["availability"].get("reads", 0))
-                                write_avail.append(exp["availability"].get("writes", 0))
-                            else:
-                                overall_avail.append(0)
-                                read_avail.append(0)
-                                write_avail.append(0)
-                        
-                        ax.plot(crash_counts, overall_avail, 'o-', label='Overall', linewidth=2, markersize=8)
-                        ax.plot(crash_counts, read_avail, 's-', label='Reads', linewidth=2, markersize=8)
-                        ax.plot(crash_counts, write_avail, '^-', label='Writes', linewidth=2, markersize=8)
-                        ax.set_xlabel('Crash Count', fontsize=10)
-                        ax.set_ylabel('Availability', fontsize=10)
-                        ax.set_title(f'N={nodes}, R={r}, W={w}', fontsize=11, fontweight='bold')
-                        ax.set_ylim([0, 1.05])
-                        ax.grid(True, alpha=0.3)
-                        if plot_idx == 0:
-                            ax.legend(fontsize=8)
-                        plot_idx += 1
-            
-            # Hide unused subplots
-            for i in range(plot_idx, len(axes)):
-                axes[i].set_visible(False)
-            
-            plt.suptitle(f'Availability vs Crash Count (RF={rf}, Concurrency={concurrency})', 
-                        fontsize=14, fontweight='bold', y=1.0)
-            plt.tight_layout()
-            filename = f"{output_dir}/availability_vs_crash_count_rf{rf}_c{concurrency}.png"
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
-            print(f"Saved: {filename}")
-            plt.close()
-
-def plot_availability_vs_quorum(experiments: List[Dict], output_dir: str = "plots"):
+        im = ax.imshow(heatmap_data, cmap='RdYlGn', aspect='auto', vmin=0, vmax=1)
+        ax.set_xticks(range(len(w_values)))
+        ax.set_xticklabels([f'W={w}' for w in w_values])
+        ax.set_yticks(range(len(r_values)))
+        ax.set_yticklabels([f'R={r}' for r in r_values])
+        ax.set_xlabel('Write Quorum (W)', fontsize=11)
+        ax.set_ylabel('Read Quorum (R)', fontsize=11)
+        ax.set_title(f'{failure_mode.capitalize()} (N={nodes})', fontsize=12, fontweight='bold')
+        
+        # Add colorbar
+        fig.colorbar(im, ax=ax, label='Availability')
+        
+        # Add text annotations
+        for (i, j), value in np.ndenumerate(heatmap_data):
+            ax.text(j, i, f'{value:.2f}',
+                    ha="center", va="center", color="black", fontweight='bold')
+    
+    fig.suptitle(f'Availability vs Quorum (RF={rf}, Concurrency={concurrency})',
+                fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    fig.savefig(filename, dpi=dpi, bbox_inches='tight')
+    return filename
+
+def plot_availability_vs_quorum(df: pd.DataFrame, output_dir: str = "plots", dpi: int = DEFAULT_DPI):
     """Plot availability vs quorum values for different failure modes, separated by RF and concurrency."""
-    os.makedirs(output_dir, exist_ok=True)
-    
     # Filter experiments with quorum values
-    quorum_experiments = [e for e in experiments 
-                         if e.get("read_quorum_r") is not None and 
-                         e.get("write_quorum_w") is not None]
+    quorum_df = df[df["read_quorum_r"].notna() & df["write_quorum_w"].notna()]
     
-    if not quorum_experiments:
+    if quorum_df.empty:
         print("No quorum experiments found")
         return
     
-    # Group by replication_factor first
-    rf_values = sorted(set(e.get("replication_factor", 0) for e in quorum_experiments))
-    failure_modes = sorted(set(e.get("failure_mode", "none") for e in quorum_experiments))
-    nodes_list = sorted(set(e.get("nodes", 0) for e in quorum_experiments))
-    concurrency_values = sorted(set(e.get("concurrency", 10) for e in quorum_experiments))
+    # Every figure gets one panel per failure mode seen in any quorum experiment
+    failure_modes = np.sort(quorum_df["failure_mode"].dropna().unique())
     
-    for rf in rf_values:
-        rf_experiments = [e for e in quorum_experiments if e.get("replication_factor") == rf]
-        if not rf_experiments:
-            continue
+    # Group by replication_factor and concurrency, then one figure per node count
+    tasks = []
+    for (rf, concurrency), conc_df in quorum_df.groupby(["replication_factor", "concurrency"]):
+        for nodes, subset in conc_df.groupby("nodes"):
+            filename = f"{output_dir}/availability_quorum_heatmap_rf{rf}_n{nodes}_c{concurrency}.png"
+            tasks.append((subset, failure_modes, rf, concurrency, nodes, dpi, filename))
+    _render_all(_render_quorum_heatmap, tasks)
+
+CONSISTENCY_METRICS = [
+    ("ryw_violations", "Read-Your-Write Violations"),
+    ("monotonic_read_violations", "Monotonic Read Violations"),
+    ("stale_read_rate", "Stale Read Rate"),
+    ("multi_version_reads", "Multi-Version Reads")
+]
+
+def _render_consistency(conc_df: pd.DataFrame, failure_modes: List[str], rf, concurrency, dpi: int,
+                        filename: str) -> str:
+    fig = _figure((14, 10))
+    axes = fig.subplots(2, 2).flatten()
+    
+    # Split by failure mode once, shared by all four metrics
+    by_mode = dict(list(conc_df.groupby("failure_mode", observed=True)))
+    
+    for idx, (metric_key, metric_name) in enumerate(CONSISTENCY_METRICS):
+        if idx >= len(axes):
+            break
+        
+        ax = axes[idx]
+        col = f"consistency_{metric_key}"
+        data_by_mode = {mode: g[col].dropna().tolist() for mode, g in by_mode.items()}
+        
+        # Create box plot
+        box_labels = [mode for mode in failure_modes if data_by_mode.get(mode)]
+        box_data = [data_by_mode[mode] for mode in box_labels]
         
-        for concurrency in concurrency_values:
-            conc_experiments = [e for e in rf_experiments if e.get("concurrency", 10) == concurrency]
-            if not conc_experiments:
-                continue
-            
-            for nodes in nodes_list:
-                subset = [e for e in conc_experiments if e.get("nodes") == nodes]
-                if not subset:
-                    continue
-                
-                fig, axes = plt.subplots(1, len(failure_modes), figsize=(6*len(failure_modes), 5))
-                if len(failure_modes) == 1:
-                    axes = [axes]
-                
-                for idx, failure_mode in enumerate(failure_modes):
-                    ax = axes[idx]
-                    mode_subset = [e for e in subset if e.get("failure_mode") == failure_mode]
-                    
-                    if not mode_subset:
-                        ax.set_visible(False)
-                        continue
-                    
-                    # Create heatmap data
-                    r_values = sorted(set(e.get("read_quorum_r", 0) for e in mode_subset))
-                    w_values = sorted(set(e.get("write_quorum_w", 0) for e in mode_subset))
-                    
-                    heatmap_data = np.zeros((len(r_values), len(w_values)))
-                    for i, r in enumerate(r_values):
-                        for j, w in enumerate(w_values):
-                            exp = next((e for e in mode_subset 
-                                       if e.get("read_quorum_r") == r and e.get("write_quorum_w") == w), None)
-                            if exp and "availability" in exp:
-                                heatmap_data[i, j] = exp["availability"].get("overall", 0)
-                    
-                    im = ax.imshow(heatmap_data, cmap='RdYlGn', aspect='auto', vmin=0, vmax=1)
-                    ax.set_xticks(range(len(w_values)))
-                    ax.set_xticklabels([f'W={w}' for w in w_values])
-                    ax.set_yticks(range(len(r_values)))
-                    ax.set_yticklabels([f'R={r}' for r in r_values])
-                    ax.set_xlabel('Write Quorum (W)', fontsize=11)
-                    ax.set_ylabel('Read Quorum (R)', fontsize=11)
-                    ax.set_title(f'{failure_mode.capitalize()} (N={nodes})', fontsize=12, fontweight='bold')
-                    
-                    # Add colorbar
-                    plt.colorbar(im, ax=ax, label='Availability')
-                    
-                    # Add text annotations
-                    for i in range(len(r_values)):
-                        for j in range(len(w_values)):
-                            text = ax.text(j, i, f'{heatmap_data[i, j]:.2f}',
-                                         ha="center", va="center", color="black", fontweight='bold')
-                
-                plt.suptitle(f'Availability vs Quorum (RF={rf}, Concurrency={concurrency})', 
-                            fontsize=14, fontweight='bold')
-                plt.tight_layout()
-                filename = f"{output_dir}/availability_quorum_heatmap_rf{rf}_n{nodes}_c{concurrency}.png"
-                plt.savefig(filename, dpi=300, bbox_inches='tight')
-                print(f"Saved: {filename}")
-                plt.close()
-
-def plot_consistency_metrics(experiments: List[Dict], output_dir: str = "plots"):
+        if box_data:
+            bp = ax.boxplot(box_data, labels=box_labels, patch_artist=True)
+            for patch in bp['boxes']:
+                patch.set_facecolor('lightblue')
+            ax.set_ylabel(metric_name, fontsize=11)
+            ax.set_xlabel('Failure Mode', fontsize=11)
+            ax.set_title(metric_name, fontsize=12, fontweight='bold')
+            ax.grid(True, alpha=0.3, axis='y')
+    
+    fig.suptitle(f'Consistency Metrics (RF={rf}, Concurrency={concurrency})',
+                fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    fig.savefig(filename, dpi=dpi, bbox_inches='tight')
+    return filename
+
+def plot_consistency_metrics(df: pd.DataFrame, output_dir: str = "plots", dpi: int = DEFAULT_DPI):
     """Plot consistency metrics across experiments, separated by RF and concurrency."""
-    os.makedirs(output_dir, exist_ok=True)
+    metric_cols = [f"consistency_{key}" for key, _ in CONSISTENCY_METRICS]
     
     # Filter experiments with consistency data
-    consistency_experiments = [e for e in experiments if "consistency" in e]
+    consistency_df = df[df[metric_cols].notna().any(axis=1)]
     
-    if not consistency_experiments:
+    if consistency_df.empty:
         print("No consistency data found")
         return
     
-    # Group by replication_factor
-    rf_values = sorted(set(e.get("replication_factor", 0) for e in consistency_experiments))
-    failure_modes = sorted(set(e.get("failure_mode", "none") for e in consistency_experiments))
-    concurrency_values = sorted(set(e.get("concurrency", 10) for e in consistency_experiments))
-    
-    metrics_to_plot = [
-        ("ryw_violations", "Read-Your-Write Violations"),
-        ("monotonic_read_violations", "Monotonic Read Violations"),
-        ("stale_read_rate", "Stale Read Rate"),
-        ("multi_version_reads", "Multi-Version Reads")
-    ]
-    
-    for rf in rf_values:
-        rf_experiments = [e for e in consistency_experiments if e.get("replication_factor") == rf]
-        if not rf_experiments:
-            continue
+    failure_modes = np.sort(consistency_df["failure_mode"].dropna().unique())
+    
+    # Group by replication_factor and concurrency
+    tasks = []
+    for (rf, concurrency), conc_df in consistency_df.groupby(["replication_factor", "concurrency"]):
+        filename = f"{output_dir}/consistency_metrics_rf{rf}_c{concurrency}.png"
+        tasks.append((conc_df, failure_modes, rf, concurrency, dpi, filename))
+    _render_all(_render_consistency, tasks)
+
+def _render_comparison(subset: pd.DataFrame, failure_modes: List[str], rf, concurrency, nodes,
+                       dpi: int, filename: str) -> str:
+    fig = _figure((12, 6))
+    ax = fig.subplots()
+    
+    # Create grouped bar chart
+    r_values = np.sort(subset["read_quorum_r"].dropna().unique())
+    w_values = np.sort(subset["write_quorum_w"].dropna().unique())
+    
+    x = np.arange(len(r_values) * len(w_values))
+    width = 0.15
+    multiplier = 0
+    
+    for mode in failure_modes:
+        mode_df = subset[subset["failure_mode"] == mode]
+        # (r, w) -> availability of the first experiment loaded for that quorum
+        first = mode_df.drop_duplicates(["read_quorum_r", "write_quorum_w"])
+        lookup = dict(zip(zip(first["read_quorum_r"], first["write_quorum_w"]), first["availability_overall"]))
+        offsets = []
+        values = []
+        
+        for r in r_values:
+            for w in w_values:
+                values.append(lookup.get((r, w), 0))
+                offsets.append(f"R{r}W{w}")
         
-        for concurrency in concurrency_values:
-            conc_experiments = [e for e in rf_experiments if e.get("concurrency", 10) == concurrency]
-            if not conc_experiments:
-                continue
-            
-            fig, axes = plt.subplots(2, 2, figsize=(14, 10))
-            axes = axes.flatten()
-            
-            for idx, (metric_key, metric_name) in enumerate(metrics_to_plot):
-                if idx >= len(axes):
-                    break
-                
-                ax = axes[idx]
-                data_by_mode = {mode: [] for mode in failure_modes}
-                
-                for exp in conc_experiments:
-                    mode = exp.get("failure_mode", "none")
-                    if "consistency" in exp and metric_key in exp["consistency"]:
-                        value = exp["consistency"][metric_key]
-                        if isinstance(value, (int, float)):
-                            data_by_mode[mode].append(value)
-                
-                # Create box plot
-                positions = range(len(failure_modes))
-                box_data = [data_by_mode[mode] for mode in failure_modes if data_by_mode[mode]]
-                box_labels = [mode for mode in failure_modes if data_by_mode[mode]]
-                
-                if box_data:
-                    bp = ax.boxplot(box_data, labels=box_labels, patch_artist=True)
-                    for patch in bp['boxes']:
-                        patch.set_facecolor('lightblue')
-                    ax.set_ylabel(metric_name, fontsize=11)
-                    ax.set_xlabel('Failure Mode', fontsize=11)
-                    ax.set_title(metric_name, fontsize=12, fontweight='bold')
-                    ax.grid(True, alpha=0.3, axis='y')
-            
-            plt.suptitle(f'Consistency Metrics (RF={rf}, Concurrency={concurrency})', 
-                        fontsize=14, fontweight='bold')
-            plt.tight_layout()
-            filename = f"{output_dir}/consistency_metrics_rf{rf}_c{concurrency}.png"
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
-            print(f"Saved: {filename}")
-            plt.close()
-
-def plot_availability_comparison(experiments: List[Dict], output_dir: str = "plots"):
+        if values:
+            ax.bar(x + multiplier * width, values, width, label=mode.capitalize())
+            multiplier += 1
+    
+    ax.set_xlabel('Quorum Configuration (R=Read, W=Write)', fontsize=11)
+    ax.set_ylabel('Availability', fontsize=11)
+    ax.set_title(f'Availability Comparison (RF={rf}, N={nodes}, Concurrency={concurrency})',
+                fontsize=12, fontweight='bold')
+    ax.set_xticks(x + width * (len(failure_modes) - 1) / 2)
+    ax.set_xticklabels(offsets, rotation=45, ha='right')
+    ax.set_ylim([0, 1.05])
+    ax.legend()
+    ax.grid(True, alpha=0.3, axis='y')
+    
+    fig.tight_layout()
+    fig.savefig(filename, dpi=dpi, bbox_inches='tight')
+    return filename
+
+def plot_availability_comparison(df: pd.DataFrame, output_dir: str = "plots", dpi: int = DEFAULT_DPI):
     """Compare availability across different failure modes and configurations, separated by RF and concurrency."""
-    os.makedirs(output_dir, exist_ok=True)
-    
     # Filter experiments with availability data
-    avail_experiments = [e for e in experiments if "availability" in e]
+    avail_df = df[df["availability_overall"].notna()]
     
-    if not avail_experiments:
+    if avail_df.empty:
         print("No availability data found")
         return
     
-    # Group by replication_factor first
-    rf_values = sorted(set(e.get("replication_factor", 0) for e in avail_experiments))
-    nodes_list = sorted(set(e.get("nodes", 0) for e in avail_experiments))
-    failure_modes = sorted(set(e.get("failure_mode", "none") for e in avail_experiments))
-    concurrency_values = sorted(set(e.get("concurrency", 10) for e in avail_experiments))
+    failure_modes = np.sort(avail_df["failure_mode"].dropna().unique())
     
-    for rf in rf_values:
-        rf_experiments = [e for e in avail_experiments if e.get("replication_factor") == rf]
-        if not rf_experiments:
-            continue
-        
-        for concurrency in concurrency_values:
-            conc_experiments = [e for e in rf_experiments if e.get("concurrency", 10) == concurrency]
-            if not conc_experiments:
-                continue
-            
-            for nodes in nodes_list:
-                subset = [e for e in conc_experiments if e.get("nodes") == nodes]
-                
-                if not subset:
-                    continue
-                
-                fig, ax = plt.subplots(figsize=(12, 6))
-                
-                # Create grouped bar chart
-                r_values = sorted(set(e.get("read_quorum_r", 0) for e in subset))
-                w_values = sorted(set(e.get("write_quorum_w", 0) for e in subset))
-                
-                x = np.arange(len(r_values) * len(w_values))
-                width = 0.15
-                multiplier = 0
-                
-                for mode in failure_modes:
-                    mode_subset = [e for e in subset if e.get("failure_mode") == mode]
-                    offsets = []
-                    values = []
-                    
-                    for r in r_values:
-                        for w in w_values:
-                            exp = next((e for e in mode_subset 
-                                       if e.get("read_quorum_r") == r and e.get("write_quorum_w") == w), None)
-                            if exp and "availability" in exp:
-                                values.append(exp["availability"].get("overall", 0))
-                            else:
-                                values.append(0)
-                            offsets.append(f"R{r}W{w}")
-                    
-                    if values:
-                        ax.bar(x + multiplier * width, values, width, label=mode.capitalize())
-                        multiplier += 1
-                
-                ax.set_xlabel('Quorum Configuration (R=Read, W=Write)', fontsize=11)
-                ax.set_ylabel('Availability', fontsize=11)
-                ax.set_title(f'Availability Comparison (RF={rf}, N={nodes}, Concurrency={concurrency})', 
-                            fontsize=12, fontweight='bold')
-                ax.set_xticks(x + width * (len(failure_modes) - 1) / 2)
-                ax.set_xticklabels(offsets, rotation=45, ha='right')
-                ax.set_ylim([0, 1.05])
-                ax.legend()
-                ax.grid(True, alpha=0.3, axis='y')
-                
-                plt.tight_layout()
-                filename = f"{output_dir}/availability_comparison_rf{rf}_n{nodes}_c{concurrency}.png"
-                plt.savefig(filename, dpi=300, bbox_inches='tight')
-                print(f"Saved: {filename}")
-                plt.close()
-
-def plot_failure_window_analysis(experiments: List[Dict], output_dir: str = "plots"):
+    # Group by replication_factor and concurrency, then one figure per node count
+    tasks = []
+    for (rf, concurrency), conc_df in avail_df.groupby(["replication_factor", "concurrency"]):
+        for nodes, subset in conc_df.groupby("nodes"):
+            filename = f"{output_dir}/availability_comparison_rf{rf}_n{nodes}_c{concurrency}.png"
+            tasks.append((subset, failure_modes, rf, concurrency, nodes, dpi, filename))
+    _render_all(_render_comparison, tasks)
+
+def plot_failure_window_analysis(df: pd.DataFrame, output_dir: str = "plots", dpi: int = DEFAULT_DPI):
     """Plot availability during different time windows (warmup, failure, recovery)."""
-    os.makedirs(output_dir, exist_ok=True)
+    windows = ["warmup", "failure"]
+    window_labels = ["Warmup", "During Failure"]
+    window_cols = [f"availability_by_window_{window}_overall" for window in windows]
     
     # Filter experiments with window data
-    window_experiments = [e for e in experiments 
-                         if "availability_by_window" in e and e.get("failure_mode") != "none"]
+    window_df = df[df[window_cols].notna().any(axis=1) & (df["failure_mode"] != "none")]
     
-    if not window_experiments:
+    if window_df.empty:
         print("No window data found")
         return
     
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
     
-    windows = ["warmup", "failure"]
-    window_labels = ["Warmup", "During Failure"]
+    # Group by failure mode
+    failure_modes = np.sort(window_df["failure_mode"].dropna().unique())
     
-    for idx, (window, label) in enumerate(zip(windows, window_labels)):
+    for idx, (window, label, col) in enumerate(zip(windows, window_labels, window_cols)):
         ax = axes[idx]
-        
-        # Group by failure mode
-        failure_modes = sorted(set(e.get("failure_mode", "none") for e in window_experiments))
-        data_by_mode = {mode: [] for mode in failure_modes}
-        
-        for exp in window_experiments:
-            mode = exp.get("failure_mode", "none")
-            if "availability_by_window" in exp and window in exp["availability_by_window"]:
-                avail = exp["availability_by_window"][window].get("overall", 0)
-                data_by_mode[mode].append(avail)
+        data_by_mode = {mode: window_df.loc[window_df["failure_mode"] == mode, col].dropna().tolist()
+                        for mode in failure_modes}
         
         # Create box plot
-        positions = range(len(failure_modes))
         box_data = [data_by_mode[mode] for mode in failure_modes if data_by_mode[mode]]
         box_labels = [mode for mode in failure_modes if data_by_mode[mode]]
         
@@ -440,128 +463,154 @@ def plot_failure_window_analysis(experiments: List[Dict], output_dir: str = "plo
             ax.grid(True, alpha=0.3, axis='y')
     
     plt.tight_layout()
-    plt.savefig(f"{output_dir}/failure_window_analysis.png", dpi=300, bbox_inches='tight')
+    plt.savefig(f"{output_dir}/failure_window_analysis.png", dpi=dpi, bbox_inches='tight')
     print(f"Saved: {output_dir}/failure_window_analysis.png")
     plt.close()
 
-def plot_concurrency_effects(experiments: List[Dict], output_dir: str = "plots"):
+def _render_concurrency(node_df: pd.DataFrame, failure_modes: List[str], rf, nodes, dpi: int,
+                        filename: str) -> str:
+    # Create subplot for each failure mode
+    fig = _figure((6*len(failure_modes), 5))
+    axes = fig.subplots(1, len(failure_modes))
+    if len(failure_modes) == 1:
+        axes = [axes]
+    
+    for idx, failure_mode in enumerate(failure_modes):
+        ax = axes[idx]
+        mode_df = node_df[node_df["failure_mode"] == failure_mode]
+        
+        if mode_df.empty:
+            ax.set_visible(False)
+            continue
+        
+        # One line per quorum configuration
+        for (r, w), subset in mode_df.groupby(["read_quorum_r", "write_quorum_w"]):
+            subset = subset.drop_duplicates("concurrency")
+            ax.plot(subset["concurrency"].values, subset["availability_overall"].values, 'o-',
+                   label=f'R={r}, W={w}', linewidth=2, markersize=8)
+        
+        ax.set_xlabel('Concurrency', fontsize=11)
+        ax.set_ylabel('Availability', fontsize=11)
+        ax.set_title(f'{failure_mode.capitalize()} (RF={rf}, N={nodes})', fontsize=12, fontweight='bold')
+        ax.set_ylim([0, 1.05])
+        ax.grid(True, alpha=0.3)
+        ax.legend(fontsize=8)
+    
+    fig.tight_layout()
+    fig.savefig(filename, dpi=dpi, bbox_inches='tight')
+    return filename
+
+def plot_concurrency_effects(df: pd.DataFrame, output_dir: str = "plots", dpi: int = DEFAULT_DPI):
     """Plot availability vs concurrency for different configurations."""
-    os.makedirs(output_dir, exist_ok=True)
-    
     # Filter experiments with availability and concurrency data
-    avail_experiments = [e for e in experiments 
-                        if "availability" in e and e.get("concurrency") is not None]
+    avail_df = df[df["availability_overall"].notna() & df["concurrency"].notna()]
     
-    if not avail_experiments:
+    if avail_df.empty:
         print("No concurrency experiments found")
         return
     
-    # Group by replication_factor, nodes, failure_mode
-    rf_values = sorted(set(e.get("replication_factor", 0) for e in avail_experiments))
-    nodes_list = sorted(set(e.get("nodes", 0) for e in avail_experiments))
-    failure_modes = sorted(set(e.get("failure_mode", "none") for e in avail_experiments))
+    # Stable sort: among experiments with the same concurrency the first loaded one is plotted
+    avail_df = avail_df.sort_values("concurrency", kind="stable")
+    failure_modes = np.sort(avail_df["failure_mode"].dropna().unique())
     
-    for rf in rf_values:
-        rf_experiments = [e for e in avail_experiments if e.get("replication_factor") == rf]
-        if not rf_experiments:
-            continue
-        
-        for nodes in nodes_list:
-            node_experiments = [e for e in rf_experiments if e.get("nodes") == nodes]
-            if not node_experiments:
-                continue
-            
-            # Create subplot for each failure mode
-            fig, axes = plt.subplots(1, len(failure_modes), figsize=(6*len(failure_modes), 5))
-            if len(failure_modes) == 1:
-                axes = [axes]
-            
-            for idx, failure_mode in enumerate(failure_modes):
-                ax = axes[idx]
-                mode_experiments = [e for e in node_experiments if e.get("failure_mode") == failure_mode]
-                
-                if not mode_experiments:
-                    ax.set_visible(False)
-                    continue
-                
-                # Group by quorum configuration
-                r_values = sorted(set(e.get("read_quorum_r", 0) for e in mode_experiments))
-                w_values = sorted(set(e.get("write_quorum_w", 0) for e in mode_experiments))
-                concurrency_values = sorted(set(e.get("concurrency", 10) for e in mode_experiments))
-                
-                for r in r_values:
-                    for w in w_values:
-                        subset = [e for e in mode_experiments 
-                                 if e.get("read_quorum_r") == r and e.get("write_quorum_w") == w]
-                        
-                        if not subset:
-                            continue
-                        
-                        conc_sorted = sorted(set(e.get("concurrency", 10) for e in subset))
-                        avail_values = []
-                        
-                        for conc in conc_sorted:
-                            exp = next((e for e in subset if e.get("concurrency", 10) == conc), None)
-                            if exp and "availability" in exp:
-                                avail_values.append(exp["availability"].get("overall", 0))
-                            else:
-                                avail_values.append(0)
-                        
-                        if avail_values:
-                            ax.plot(conc_sorted, avail_values, 'o-', 
-                                   label=f'R={r}, W={w}', linewidth=2, markersize=8)
-                
-                ax.set_xlabel('Concurrency', fontsize=11)
-                ax.set_ylabel('Availability', fontsize=11)
-                ax.set_title(f'{failure_mode.capitalize()} (RF={rf}, N={nodes})', fontsize=12, fontweight='bold')
-                ax.set_ylim([0, 1.05])
-                ax.grid(True, alpha=0.3)
-                ax.legend(fontsize=8)
-            
-            plt.tight_layout()
-            filename = f"{output_dir}/availability_vs_concurrency_rf{rf}_n{nodes}.png"
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
-            print(f"Saved: {filename}")
-            plt.close()
-
-def generate_summary_table(experiments: List[Dict], output_dir: str = "plots"):
+    # Group by replication_factor, nodes, failure_mode
+    tasks = []
+    for (rf, nodes), node_df in avail_df.groupby(["replication_factor", "nodes"]):
+        filename = f"{output_dir}/availability_vs_concurrency_rf{rf}_n{nodes}.png"
+        tasks.append((node_df, failure_modes, rf, nodes, dpi, filename))
+    _render_all(_render_concurrency, tasks)
+
+def generate_summary_table(df: pd.DataFrame, output_dir: str = "plots"):
     """Generate a summary table of all experiments, including RF and concurrency."""
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Create DataFrame
-    rows = []
-    for exp in experiments:
-        row = {
-            "Suite": exp.get("suite", "unknown"),
-            "Nodes": exp.get("nodes", "?"),
-            "RF": exp.get("replication_factor", "?"),
-            "R": exp.get("read_quorum_r", "?"),
-            "W": exp.get("write_quorum_w", "?"),
-            "Failure": exp.get("failure_mode", "?"),
-            "Crash Count": exp.get("crash_count", "?"),
-            "Concurrency": exp.get("concurrency", "?"),
-            "Overall Avail": exp.get("availability", {}).get("overall", 0) if "availability" in exp else 0,
-            "Read Avail": exp.get("availability", {}).get("reads", 0) if "availability" in exp else 0,
-            "Write Avail": exp.get("availability", {}).get("writes", 0) if "availability" in exp else 0,
-            "RYW Violations": exp.get("consistency", {}).get("ryw_violations", 0) if "consistency" in exp else 0,
-            "Stale Read Rate": exp.get("consistency", {}).get("stale_read_rate", 0) if "consistency" in exp else 0,
-        }
-        rows.append(row)
-    
-    df = pd.DataFrame(rows)
-    df = df.sort_values(by=["RF", "Nodes", "R", "W", "Failure", "Crash Count", "Concurrency"])
+    def setting(col, missing="?"):
+        # object column: the Int32 and categorical ones can't hold the placeholder
+        return df[col].astype(object).fillna(missing)
+    
+    # Select and rename columns; missing settings show as "?", missing metrics count as 0
+    summary = pd.DataFrame({
+        "Suite": setting("suite", "unknown"),
+        "Nodes": setting("nodes"),
+        "RF": setting("replication_factor"),
+        "R": setting("read_quorum_r"),
+        "W": setting("write_quorum_w"),
+        "Failure": setting("failure_mode"),
+        "Crash Count": setting("crash_count"),
+        "Concurrency": setting("concurrency"),
+        "Overall Avail": df["availability_overall"].fillna(0),
+        "Read Avail": df["availability_reads"].fillna(0),
+        "Write Avail": df["availability_writes"].fillna(0),
+        "RYW Violations": df["consistency_ryw_violations"].fillna(0),
+        "Stale Read Rate": df["consistency_stale_read_rate"].fillna(0),
+    })
+    summary = summary.sort_values(by=["RF", "Nodes", "R", "W", "Failure", "Crash Count", "Concurrency"])
     
     # Save to CSV
     csv_path = f"{output_dir}/experiment_summary.csv"
-    df.to_csv(csv_path, index=False)
+    summary.to_csv(csv_path, index=False)
     print(f"Saved: {csv_path}")
     
     # Save formatted table
     html_path = f"{output_dir}/experiment_summary.html"
-    df.to_html(html_path, index=False, float_format=lambda x: f'{x:.4f}' if isinstance(x, float) else str(x))
+    # float_format is only called for float columns, so no per-cell type check is needed
+    summary.to_html(html_path, index=False, float_format="{:.4f}".format)
     print(f"Saved: {html_path}")
     
-    return df
+    return summary
+
+# Plot phase name -> (progress message, fn(df, output_dir, dpi))
+PHASES = {
+    "crash_count": ("Generating crash count plots (separated by RF and concurrency)...",
+                    plot_availability_vs_crash_count),
+    "quorum": ("Generating quorum heatmaps (separated by RF and concurrency)...",
+               plot_availability_vs_quorum),
+    "consistency": ("Generating consistency plots...", plot_consistency_metrics),
+    "comparison": ("Generating availability comparison plots (separated by RF and concurrency)...",
+                   plot_availability_comparison),
+    "windows": ("Generating failure window analysis...", plot_failure_window_analysis),
+    "concurrency": ("Generating concurrency effect plots...", plot_concurrency_effects),
+    "summary": ("Generating summary table (including RF and concurrency)...",
+                lambda df, output_dir, dpi: generate_summary_table(df, output_dir)),
+}
+
+def _run_phase(name: str, df: pd.DataFrame, output_dir: str, dpi: int):
+    message, fn = PHASES[name]
+    print(f"\n{message}")
+    fn(df, output_dir, dpi)
+
+def _run_phase_from_file(name: str, frame_file: str, output_dir: str, dpi: int) -> str:
+    """Pool worker: run one phase on the shared frame file and return what it printed."""
+    df = pd.read_feather(frame_file, use_threads=False)
+    out = io.StringIO()
+    with redirect_stdout(out):
+        _run_phase(name, df, output_dir, dpi)
+    return out.getvalue()
+
+def _run_phases(phases: List[str], df: pd.DataFrame, output_dir: str, dpi: int):
+    """
+    Run the given plot phases. They only read df, so with more than one CPU they
+    run side by side in a process pool, each rendering its figures in-process;
+    df is written once to an uncompressed feather file (in /dev/shm when there
+    is one) that every worker reads back instead of unpickling its own copy.
+    Output is printed phase by phase, in the order given.
+    """
+    processes = min(len(phases), os.cpu_count() or 1)
+    if processes <= 1:
+        for name in phases:
+            _run_phase(name, df, output_dir, dpi)
+        return
+    
+    shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    fd, frame_file = tempfile.mkstemp(prefix="experiments_", suffix=".feather", dir=shm)
+    os.close(fd)
+    try:
+        df.to_feather(frame_file, compression="uncompressed")
+        with multiprocessing.Pool(processes=processes) as pool:
+            outputs = pool.starmap(_run_phase_from_file,
+                                   [(name, frame_file, output_dir, dpi) for name in phases])
+    finally:
+        os.unlink(frame_file)
+    for out in outputs:
+        print(out, end="")
 
 def main():
     parser = argparse.ArgumentParser(description="Visualize Dynamo experiment results")
@@ -570,51 +619,29 @@ def main():
     parser.add_argument("--output-dir", type=str, default="plots",
                        help="Directory to save plots")
     parser.add_argument("--plots", nargs="+", 
-                       choices=["all", "crash_count", "quorum", "consistency", "comparison", "windows", "concurrency", "summary"],
+                       choices=["all", *PHASES],
                        default=["all"],
                        help="Which plots to generate")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI,
+                       help="Resolution of the saved PNG plots")
     
     args = parser.parse_args()
+    # created once here; the plot functions expect it to exist
+    os.makedirs(args.output_dir, exist_ok=True)
     
     print(f"Loading experiments from {args.results_dir}...")
-    experiments = load_experiment_data(args.results_dir)
-    print(f"Loaded {len(experiments)} experiments")
+    # One flattened frame (cached across runs); every plot below splits it
+    df = load_experiment_frame(args.results_dir, args.output_dir)
+    print(f"Loaded {len(df)} experiments")
     
-    if not experiments:
+    if df.empty:
         print("No experiments found!")
         return
     
-    plots_to_generate = args.plots
-    if "all" in plots_to_generate:
-        plots_to_generate = ["crash_count", "quorum", "consistency", "comparison", "windows", "concurrency", "summary"]
-    
-    if "crash_count" in plots_to_generate:
-        print("\nGenerating crash count plots (separated by RF and concurrency)...")
-        plot_availability_vs_crash_count(experiments, args.output_dir)
-    
-    if "quorum" in plots_to_generate:
-        print("\nGenerating quorum heatmaps (separated by RF and concurrency)...")
-        plot_availability_vs_quorum(experiments, args.output_dir)
-    
-    if "consistency" in plots_to_generate:
-        print("\nGenerating consistency plots...")
-        plot_consistency_metrics(experiments, args.output_dir)
-    
-    if "comparison" in plots_to_generate:
-        print("\nGenerating availability comparison plots (separated by RF and concurrency)...")
-        plot_availability_comparison(experiments, args.output_dir)
-    
-    if "windows" in plots_to_generate:
-        print("\nGenerating failure window analysis...")
-        plot_failure_window_analysis(experiments, args.output_dir)
-    
-    if "concurrency" in plots_to_generate:
-        print("\nGenerating concurrency effect plots...")
-        plot_concurrency_effects(experiments, args.output_dir)
+    # selected phases, each once, in PHASES order
+    plots_to_generate = [name for name in PHASES if name in args.plots or "all" in args.plots]
     
-    if "summary" in plots_to_generate:
-        print("\nGenerating summary table (including RF and concurrency)...")
-        generate_summary_table(experiments, args.output_dir)
+    _run_phases(plots_to_generate, df, args.output_dir, args.dpi)
     
     print(f"\nAll plots saved to {args.output_dir}/")
 